@@ -0,0 +1,110 @@
+# PyXE Async Driver
+
+import asyncio
+import collections
+import contextlib
+import sys
+import com
+import emu
+import interrupts
+import paging
+import terminal
+
+SLICE = 10000
+
+class console(terminal.main):
+    def __init__(self, writer=None, threshold=4096):
+        super().__init__(threshold=threshold)
+        self.writer = writer
+        self.pending = collections.deque()
+        self.closed = False
+
+    def feed(self, line):
+        self.pending.append(line)
+
+    def close(self):
+        self.closed = True
+
+    def readline(self):
+        self.flush()
+        if self.pending:
+            line = self.pending.popleft()
+            return line[:-1] if line.endswith('\n') else line
+        if self.closed:
+            raise EOFError
+        raise terminal.WouldBlock
+
+    def flush(self):
+        if self.buffer:
+            text = ''.join(self.buffer)
+            if self.writer is None:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            else:
+                self.writer.write(text.encode('utf-8'))
+            self.buffer.clear()
+            self.size = 0
+
+async def drive(emulator, reader, steps=SLICE):
+    device = emulator.console
+    while True:
+        emulator.run(steps)
+        if device.writer is not None:
+            await device.writer.drain()
+
+        if emulator.status == 'blocked':
+            line = await reader.readline()
+            if line:
+                device.feed(line.decode('utf-8', 'replace'))
+            else:
+                device.close()
+        elif emulator.status == 'steps':
+            await asyncio.sleep(0)
+        else:
+            return emulator.exit_code
+
+def session(result, writer=None, use_jit=False):
+    emulator = emu.main(use_jit=use_jit, console=console(writer), memory=paging.paged())
+    interrupts.install(emulator)
+    emulator.load_program(result['code'], result['data'], result['labels'], result.get('version', 1),
+                          result.get('symbols'))
+    return emulator
+
+async def serve(result, host='127.0.0.1', port=8023, use_jit=False):
+    async def connected(reader, writer):
+        try:
+            await drive(session(result, writer, use_jit), reader)
+        except (ConnectionError, EOFError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    server = await asyncio.start_server(connected, host, port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+async def interactive(result, use_jit=False):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    return await drive(session(result, None, use_jit), reader)
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python aio.py program.pyxe [--port PORT] [--host HOST] [-j]")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        result = com.main().compile(f.read(), sys.argv[1])
+
+    use_jit = '-j' in sys.argv
+    if '--port' in sys.argv:
+        host = sys.argv[sys.argv.index('--host') + 1] if '--host' in sys.argv else '127.0.0.1'
+        port = int(sys.argv[sys.argv.index('--port') + 1])
+        print(f"Serving {sys.argv[1]} on {host}:{port}")
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(serve(result, host, port, use_jit))
+    else:
+        asyncio.run(interactive(result, use_jit))
@@ -0,0 +1,54 @@
+# PyXE ALU Flags
+
+MASK = 0xFFFFFFFF
+SIGN = 0x80000000
+
+CF = 0x01
+ZF = 0x40
+SF = 0x80
+OF = 0x800
+
+def flags_add(a, b, result):
+    flags = CF if a + b > MASK else 0
+    if result == 0:
+        flags |= ZF
+    elif result & SIGN:
+        flags |= SF
+    if ~(a ^ b) & (a ^ result) & SIGN:
+        flags |= OF
+    return flags
+
+def flags_sub(a, b, result):
+    flags = CF if a < b else 0
+    if result == 0:
+        flags |= ZF
+    elif result & SIGN:
+        flags |= SF
+    if (a ^ b) & (a ^ result) & SIGN:
+        flags |= OF
+    return flags
+
+def flags_logic(result):
+    if result == 0:
+        return ZF
+    return SF if result & SIGN else 0
+
+def flags_inc(eflags, result):
+    flags = eflags & CF
+    if result == 0:
+        flags |= ZF
+    elif result & SIGN:
+        flags |= SF
+        if result == SIGN:
+            flags |= OF
+    return flags
+
+def flags_dec(eflags, result):
+    flags = eflags & CF
+    if result == 0:
+        flags |= ZF
+    elif result & SIGN:
+        flags |= SF
+    elif result == 0x7FFFFFFF:
+        flags |= OF
+    return flags
@@ -0,0 +1,125 @@
+# PyXE Batch Runner
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import emu
+import paging
+import session
+import snapshot
+import terminal
+
+checkpoints = {}
+sessions = {}
+
+def collect(paths, extension='.pyxe'):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(extension):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+def checkpoint(filename, use_jit):
+    key = (filename, use_jit)
+    if key not in checkpoints:
+        checkpoints[key] = snapshot.load(filename, emu.main(use_jit=use_jit, memory=paging.paged(0)))
+    return checkpoints[key]
+
+def reusable(use_jit):
+    if use_jit not in sessions:
+        sessions[use_jit] = session.main(use_jit=use_jit)
+    return sessions[use_jit]
+
+def run_program(filename, steps=None, time_limit=None, use_jit=False, start=None):
+    report = {
+        'file': filename,
+        'status': 'halted',
+        'exit_code': None,
+        'output': '',
+        'registers': {},
+        'eip': 0,
+        'instructions': 0,
+        'time': 0.0
+    }
+
+    stdin_name = filename if start else os.path.splitext(filename)[0] + '.in'
+    stdin_text = ''
+    if os.path.exists(stdin_name):
+        with open(stdin_name, 'r', encoding='utf-8') as f:
+            stdin_text = f.read()
+
+    output = io.StringIO()
+    started = time.perf_counter()
+    deadline = None if time_limit is None else started + time_limit
+
+    if not start:
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                source = f.read()
+            report.update(reusable(use_jit).compile_and_run(source, stdin_text, steps, deadline, filename))
+        except OSError as e:
+            report['status'] = 'error'
+            report['error'] = f"{type(e).__name__}: {e}"
+        report['time'] = round(time.perf_counter() - started, 6)
+        return report
+
+    try:
+        console = terminal.main(stdin=io.StringIO(stdin_text), stdout=output, line_buffered=False)
+
+        with contextlib.redirect_stdout(output):
+            emulator = checkpoint(start, use_jit).fork(console)
+            executed = emulator.run(sys.maxsize if steps is None else steps, deadline)
+            report['status'] = emulator.status
+
+        report['exit_code'] = emulator.exit_code
+        report['registers'] = dict(emulator.registers)
+        report['eip'] = emulator.eip
+        report['instructions'] = executed
+
+    except Exception as e:
+        report['status'] = 'error'
+        report['error'] = f"{type(e).__name__}: {e}"
+
+    report['output'] = output.getvalue()
+    report['time'] = round(time.perf_counter() - started, 6)
+    return report
+
+def run_batch(files, out, workers=None, steps=None, time_limit=None, use_jit=False, start=None):
+    count = len(files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        reports = executor.map(run_program, files, [steps] * count, [time_limit] * count, [use_jit] * count,
+                               [start] * count)
+        for report in reports:
+            out.write(json.dumps(report) + '\n')
+            out.flush()
+
+if __name__ == '__main__':
+    paths = []
+    options = {}
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg in ('--workers', '--steps', '--time', '--output', '--snapshot'):
+            options[arg] = next(args)
+        elif arg != '-j':
+            paths.append(arg)
+
+    out = open(options['--output'], 'w', encoding='utf-8') if '--output' in options else sys.stdout
+    try:
+        start = options.get('--snapshot')
+        run_batch(collect(paths, '.in' if start else '.pyxe'), out,
+                  workers=int(options['--workers']) if '--workers' in options else None,
+                  steps=int(options['--steps']) if '--steps' in options else None,
+                  time_limit=float(options['--time']) if '--time' in options else None,
+                  use_jit='-j' in sys.argv,
+                  start=start)
+    finally:
+        if out is not sys.stdout:
+            out.close()
@@ -0,0 +1,199 @@
+# PyXE Benchmarks
+
+import io
+import json
+import os
+import sys
+import time
+import com
+import emu
+import interrupts
+import terminal
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+INTERACTIVE_INPUT = 'LOOK\nGO NORTH\nTAKE KEY\nINVENTORY\nGO SOUTH\nUSE KEY\n' * 200 + 'QUIT\n'
+
+def loop(body, iterations):
+    return f"""
+    drag COUNT, 0
+bench_loop:
+{body}
+    increase COUNT
+    compare COUNT, {iterations}
+    go-false bench_loop
+    stop
+"""
+
+PROGRAMS = {
+    'alu': loop("""
+    drag ACCUMULATOR, COUNT
+    add ACCUMULATOR, 3
+    subtract ACCUMULATOR, BASE
+    logic-and ACCUMULATOR, 0xFF
+    logic-or BASE, 1
+    exclude-or DATA, ACCUMULATOR""", 20000),
+    'branch': loop("""
+    compare ACCUMULATOR, 1
+    go-true bench_skip
+    compare ACCUMULATOR, 2
+    go-false bench_skip
+bench_skip:
+    pass""", 20000),
+    'call': """
+    drag COUNT, 0
+bench_loop:
+    call bench_sub
+    increase COUNT
+    compare COUNT, 20000
+    go-false bench_loop
+    stop
+bench_sub:
+    increase ACCUMULATOR
+    return
+""",
+    'stack': loop("""
+    place ACCUMULATOR
+    place BASE
+    extract DATA
+    extract SOURCE""", 20000),
+    'memory': loop("""
+    drag [0x3000], COUNT
+    drag ACCUMULATOR, [0x3000]
+    add [0x3004], ACCUMULATOR
+    drag BASE, [0x3004]""", 20000),
+    'print': loop("""
+    print "benchmark line\\n"
+    print COUNT""", 10000)
+}
+
+INTERACTIVE = """
+    drag SOURCE, 0
+    drag DEST, line_buffer
+read_line:
+    print "> "
+    drag ACCUMULATOR, 3
+    drag BASE, 0
+    drag COUNT, line_buffer
+    drag DATA, 64
+    interrupt 0x80
+    drag DATA, ACCUMULATOR
+    drag ACCUMULATOR, [line_buffer]
+    compare ACCUMULATOR, 0x54495551
+    go-true finished
+    drag COUNT, 0
+sum_bytes:
+    drag ACCUMULATOR, [DEST+COUNT*1]
+    logic-and ACCUMULATOR, 0xFF
+    add SOURCE, ACCUMULATOR
+    increase COUNT
+    compare COUNT, DATA
+    go-false sum_bytes
+    drag ACCUMULATOR, 4
+    drag BASE, 1
+    drag COUNT, line_buffer
+    interrupt 0x80
+    print "\\n"
+    go read_line
+finished:
+    print SOURCE
+    stop
+reserve-bytes line_buffer: 64
+"""
+
+class null_sink(io.TextIOBase):
+    def write(self, text):
+        return len(text)
+
+def execute(source, use_jit=False, stdin_text='', steps=10 ** 9):
+    result = com.main().compile(source)
+    console = terminal.main(stdin=io.StringIO(stdin_text), stdout=null_sink(), line_buffered=False)
+    emulator = emu.main(use_jit=use_jit, console=console)
+    interrupts.install(emulator)
+    emulator.load_program(result['code'], result['data'], result['labels'])
+
+    started = time.perf_counter()
+    executed = emulator.run(steps)
+    elapsed = time.perf_counter() - started
+    return executed, elapsed
+
+def bench_program(name, source, use_jit, repeat, **kwargs):
+    best = None
+    for _ in range(repeat):
+        executed, elapsed = execute(source, use_jit, **kwargs)
+        if best is None or elapsed < best[1]:
+            best = (executed, elapsed)
+    executed, elapsed = best
+    return {'instructions': executed, 'seconds': elapsed, 'rate': executed / elapsed, 'unit': 'instr/s'}
+
+def bench_compile(lines, repeat):
+    source = '\n'.join(
+        f"label_{i}:\n    drag ACCUMULATOR, {i}\n    add ACCUMULATOR, BASE\n    compare ACCUMULATOR, 7\n    go-false label_{i + 1}"
+        for i in range(lines // 5)
+    ) + f"\nlabel_{lines // 5}:\n    stop\n"
+    count = len(source.splitlines())
+
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        com.main().compile(source)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {'lines': count, 'seconds': best, 'rate': count / best, 'unit': 'lines/s'}
+
+def bench_data(values, repeat):
+    source = '\n'.join(
+        f"defdouble table_{i}: " + ', '.join(str(i * 100 + j) for j in range(100))
+        for i in range(values // 100)
+    ) + '\nstop\n'
+
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        com.main().compile(source)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {'values': values, 'seconds': best, 'rate': values / best, 'unit': 'val/s'}
+
+def run_all(use_jit=False, repeat=3):
+    mode = 'jit' if use_jit else 'interp'
+    results = {}
+    for name, source in PROGRAMS.items():
+        results[f"{name}/{mode}"] = bench_program(name, source, use_jit, repeat)
+
+    results[f"interactive/{mode}"] = bench_program('interactive', INTERACTIVE, use_jit, repeat,
+                                                   stdin_text=INTERACTIVE_INPUT)
+
+    results['compile/100k'] = bench_compile(100000, repeat)
+    results['compile/data'] = bench_data(100000, repeat)
+    return results
+
+def report(results, baseline=None):
+    lines = [f"{'benchmark':<18} {'rate':>16} {'seconds':>10} {'vs baseline':>12}"]
+    for name, result in results.items():
+        line = f"{name:<18} {result['rate']:>10.0f} {result['unit']:<5} {result['seconds']:>10.4f}"
+        if baseline and name in baseline:
+            line += f" {result['rate'] / baseline[name]['rate']:>11.2f}x"
+        lines.append(line)
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    baseline_name = BASELINE
+    if '--baseline' in sys.argv:
+        baseline_name = sys.argv[sys.argv.index('--baseline') + 1]
+
+    results = run_all(use_jit='-j' in sys.argv)
+
+    baseline = None
+    if os.path.exists(baseline_name):
+        with open(baseline_name, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(report(results, baseline))
+
+    if '--save' in sys.argv:
+        if baseline:
+            baseline.update(results)
+            results = baseline
+        with open(baseline_name, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {baseline_name}")
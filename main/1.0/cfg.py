@@ -0,0 +1,359 @@
+# PyXE Control Flow Graph
+
+import re
+
+MASK = 0xFFFFFFFF
+CODE_START = 0x1000
+DATA_START = 0x2000
+
+REGISTERS = ('ACCUMULATOR', 'BASE', 'COUNT', 'DATA', 'SOURCE', 'DEST', 'BASEPOINTER', 'STACKPOINTER')
+ALL = frozenset(REGISTERS)
+STACK = frozenset(('STACKPOINTER',))
+
+BRANCHES = {'JMP', 'JE', 'JNE', 'CALL'}
+EXITS = {'JMP', 'RET', 'HLT'}
+FLAG_WRITERS = {'ADD', 'SUB', 'AND', 'OR', 'XOR', 'CMP'}
+FLAG_READERS = {'JE', 'JNE'}
+DATA_WIDTHS = {'DB': 1, 'DW': 2, 'DD': 4, 'RESB': 1, 'RESD': 4, 'INCBIN': 1}
+
+ARITHMETIC = {
+    'ADD': lambda a, b: a + b,
+    'SUB': lambda a, b: a - b,
+    'AND': lambda a, b: a & b,
+    'OR': lambda a, b: a | b,
+    'XOR': lambda a, b: a ^ b
+}
+
+def register(operand):
+    name = operand.upper()
+    return name if name in ALL else None
+
+def number(operand):
+    try:
+        return int(operand, 0)
+    except ValueError:
+        return None
+
+def inline_string(mnemonic, operands):
+    return mnemonic == 'PRINT' and operands and operands[0][:1] in ('"', "'")
+
+def terms(operand):
+    return re.split(r'[\s+\-*]+', operand[1:-1].strip()) if operand.startswith('[') else [operand]
+
+def registers(operand):
+    return {name for name in (register(term) for term in terms(operand)) if name}
+
+def effects(mnemonic, operands):
+    first = operands[0] if operands else ''
+    second = operands[1] if len(operands) > 1 else ''
+    if mnemonic == 'MOV':
+        target = register(first)
+        return registers(second) | (set() if target else registers(first)), {target} if target else set()
+    if mnemonic in ARITHMETIC:
+        target = register(first)
+        return registers(first) | registers(second), {target} if target else set()
+    if mnemonic == 'CMP':
+        return registers(first) | registers(second), set()
+    if mnemonic in ('INC', 'DEC'):
+        return registers(first), registers(first)
+    if mnemonic == 'PUSH':
+        return registers(first) | STACK, STACK
+    if mnemonic == 'POP':
+        return STACK, registers(first) | STACK
+    if mnemonic == 'INPUT':
+        return set(), registers(first)
+    if mnemonic == 'PRINT':
+        return registers(first), set()
+    if mnemonic in ('INT', 'CALL', 'RET', 'HLT'):
+        return ALL, set()
+    return set(), set()
+
+class block:
+    def __init__(self, number):
+        self.number = number
+        self.labels = []
+        self.records = []
+        self.successors = []
+
+class graph:
+    def __init__(self, program):
+        self.program = program
+        self.blocks = []
+        self.owner = {}
+        self.constants = {}
+        self.taken = set()
+        self.data_size = 0
+        self.valid = True
+        self.build()
+
+    def build(self):
+        program = self.program
+        current = None
+        pending = []
+        defined = set()
+        named = set()
+
+        for index, (line_no, kind, first, second) in enumerate(program):
+            if kind == 'label':
+                if first in defined:
+                    self.valid = False
+                defined.add(first)
+                pending.append(index)
+            elif kind == 'equ':
+                self.constants[first] = second
+            elif kind == 'data':
+                self.data_size += (first if isinstance(first, int) else len(first)) * DATA_WIDTHS[second]
+                if isinstance(first, tuple):
+                    named.update(value for value in first if isinstance(value, str))
+                pending = []
+            elif kind == 'ins':
+                if current is None or pending or program[current.records[-1]][2] in BRANCHES | EXITS:
+                    current = block(len(self.blocks))
+                    self.blocks.append(current)
+                current.labels.extend(pending)
+                pending = []
+                current.records.append(index)
+                if inline_string(first, second):
+                    self.data_size += len(second[0].encode('utf-8')) + 1
+
+        indirect = popped = False
+        self.end = block(len(self.blocks))
+        self.end.labels = pending
+        self.blocks.append(self.end)
+        for item in self.blocks:
+            for index in item.labels:
+                self.owner[program[index][2]] = item.number
+        self.referenced = {self.owner[name] for name in named if name in self.owner}
+        self.taken |= self.referenced
+
+        for item in self.blocks[:-1]:
+            line_no, kind, mnemonic, operands = program[item.records[-1]]
+            if mnemonic in BRANCHES:
+                target = self.owner.get(operands[0]) if operands else None
+                if target is None:
+                    self.valid = False
+                    continue
+                item.successors.append((target, 'call' if mnemonic == 'CALL' else 'jump' if mnemonic == 'JMP' else 'taken'))
+            if mnemonic not in EXITS:
+                item.successors.append((item.number + 1, 'return' if mnemonic == 'CALL' else 'fall'))
+
+            for index in item.records:
+                line_no, kind, mnemonic, operands = program[index]
+                if mnemonic == 'POP':
+                    popped = True
+                if (mnemonic == 'MOV' or mnemonic in ARITHMETIC) and operands and operands[0].startswith('[') and \
+                        registers(operands[0]):
+                    indirect = True
+                for position, operand in enumerate(operands):
+                    if mnemonic in BRANCHES and position == 0:
+                        continue
+                    for term in terms(operand):
+                        value = number(term)
+                        if value is None:
+                            value = self.constants.get(term)
+                        if value is not None and CODE_START <= value < DATA_START + self.data_size:
+                            self.valid = False
+                    if operand.startswith('[') and operand[1:-1].strip() in self.owner:
+                        self.valid = False
+                    elif operand in self.owner:
+                        self.taken.add(self.owner[operand])
+
+        if indirect and (self.taken or popped):
+            self.valid = False
+
+    def reachable(self):
+        seen = {0} | self.referenced
+        work = list(seen)
+        while work:
+            item = self.blocks[work.pop()]
+            found = [target for target, edge in item.successors]
+            for index in item.records:
+                found.extend(self.owner[operand] for operand in self.program[index][3] if operand in self.owner)
+            for target in found:
+                if target not in seen:
+                    seen.add(target)
+                    work.append(target)
+        return seen
+
+    def entries(self):
+        return self.taken | {target for item in self.blocks for target, edge in item.successors if edge == 'return'}
+
+    def value(self, operand, state):
+        name = register(operand)
+        if name:
+            return state.get(name)
+        if operand in self.constants:
+            return self.constants[operand] & MASK
+        if operand[:1] in '0123456789+-':
+            value = number(operand)
+            return None if value is None else value & MASK
+        return None
+
+    def transfer(self, record, state):
+        line_no, kind, mnemonic, operands = record
+        target = register(operands[0]) if operands else None
+        if mnemonic == 'MOV' and target:
+            value = self.value(operands[1], state) if len(operands) > 1 else None
+        elif mnemonic in ARITHMETIC and target:
+            a = state.get(target)
+            b = self.value(operands[1], state) if len(operands) > 1 else None
+            value = None if a is None or b is None else ARITHMETIC[mnemonic](a, b) & MASK
+        elif mnemonic in ('INC', 'DEC') and target:
+            value = state.get(target)
+            value = None if value is None else (value + (1 if mnemonic == 'INC' else -1)) & MASK
+        elif mnemonic in ('POP', 'INPUT') and target:
+            value = None
+        elif mnemonic == 'INT':
+            state.clear()
+            return
+        else:
+            return
+        if value is None or target == 'STACKPOINTER':
+            state.pop(target, None)
+        else:
+            state[target] = value
+
+    def constant_states(self, reachable):
+        states = {0: {name: 0 for name in REGISTERS if name != 'STACKPOINTER'}}
+        for number in self.entries():
+            states[number] = {}
+        work = sorted(states)
+        while work:
+            item = self.blocks[work.pop()]
+            state = dict(states[item.number])
+            for index in item.records:
+                self.transfer(self.program[index], state)
+            for target, edge in item.successors:
+                incoming = {} if edge == 'return' else state
+                if target not in states:
+                    merged = dict(incoming)
+                else:
+                    merged = {name: value for name, value in states[target].items() if incoming.get(name) == value}
+                    if merged == states[target]:
+                        continue
+                states[target] = merged
+                work.append(target)
+        return states
+
+    def liveness(self, reachable):
+        flags = {number: False for number in reachable}
+        live = {number: set() for number in reachable}
+        changed = True
+        while changed:
+            changed = False
+            for number in sorted(reachable, reverse=True):
+                item = self.blocks[number]
+                flag_out, live_out = self.live_out(item, flags, live)
+                flag_in, live_in = flag_out, set(live_out)
+                for index in reversed(item.records):
+                    flag_in, live_in = self.step_back(self.program[index], flag_in, live_in)
+                if flag_in != flags[number] or live_in != live[number]:
+                    flags[number] = flag_in
+                    live[number] = live_in
+                    changed = True
+        return flags, live
+
+    def live_out(self, item, flags, live):
+        if item is self.end:
+            return True, set(ALL)
+        if not item.successors:
+            return True, set(ALL)
+        flag_out = False
+        live_out = set()
+        for target, edge in item.successors:
+            flag_out = flag_out or flags.get(target, True)
+            live_out |= live.get(target, ALL)
+        return flag_out, live_out
+
+    def step_back(self, record, flag, live):
+        line_no, kind, mnemonic, operands = record
+        if mnemonic in FLAG_WRITERS:
+            flag = False
+        if mnemonic in FLAG_READERS or mnemonic in ('RET', 'HLT', 'CALL'):
+            flag = True
+        reads, writes = effects(mnemonic, operands)
+        return flag, (live - writes) | reads
+
+    def dot(self):
+        reachable = self.reachable() if self.valid else set(range(len(self.blocks)))
+        lines = ['digraph cfg {', '    node [shape=box, fontname="monospace"];']
+        for item in self.blocks:
+            if item is self.end and not item.labels and not any(
+                    target == item.number for other in self.blocks for target, edge in other.successors):
+                continue
+            text = [self.program[index][2] + ':' for index in item.labels]
+            for index in item.records:
+                line_no, kind, mnemonic, operands = self.program[index]
+                text.append(f"    {mnemonic} {', '.join(operands)}".rstrip())
+            if item is self.end:
+                text.append('(end of code)')
+            label = ''.join(line.replace('\\', '\\\\').replace('"', '\\"') + '\\l' for line in text)
+            style = '' if item.number in reachable else ', style=dashed'
+            lines.append(f'    b{item.number} [label="{label}"{style}];')
+        for item in self.blocks:
+            for target, edge in item.successors:
+                lines.append(f'    b{item.number} -> b{target} [label="{edge}"];')
+        lines.append('}')
+        return '\n'.join(lines)
+
+class main:
+    def __init__(self):
+        self.folded = 0
+
+    def optimize(self, program):
+        while True:
+            result = self.simplify(program)
+            if result == program:
+                return program
+            program = result
+
+    def simplify(self, program):
+        flow = graph(program)
+        if not flow.valid:
+            return program
+
+        reachable = flow.reachable()
+        states = flow.constant_states(reachable)
+        removed = set()
+        replaced = {}
+
+        for item in flow.blocks:
+            if item.number not in reachable:
+                removed.update(item.labels)
+                removed.update(item.records)
+                continue
+            state = dict(states.get(item.number, {}))
+            records = item.records
+            for position, index in enumerate(records):
+                line_no, kind, mnemonic, operands = program[index]
+                if mnemonic == 'CMP' and len(operands) == 2 and position + 1 < len(records):
+                    jump = program[records[position + 1]]
+                    a = flow.value(operands[0], state)
+                    b = flow.value(operands[1], state)
+                    if jump[2] in ('JE', 'JNE') and a is not None and b is not None:
+                        if (a == b) == (jump[2] == 'JE'):
+                            replaced[records[position + 1]] = (jump[0], 'ins', 'JMP', jump[3])
+                        else:
+                            removed.add(records[position + 1])
+                        self.folded += 1
+                flow.transfer(program[index], state)
+
+        if removed or replaced:
+            return [replaced.get(index, record) for index, record in enumerate(program) if index not in removed]
+
+        flags, live = flow.liveness(reachable)
+        for number in reachable:
+            item = flow.blocks[number]
+            flag, alive = flow.live_out(item, flags, live)
+            for index in reversed(item.records):
+                line_no, kind, mnemonic, operands = program[index]
+                if mnemonic == 'CMP' and not flag:
+                    removed.add(index)
+                    continue
+                if mnemonic == 'MOV' and len(operands) == 2 and register(operands[0]) not in alive and \
+                        register(operands[0]) and not operands[1].startswith('['):
+                    removed.add(index)
+                    continue
+                flag, alive = flow.step_back(program[index], flag, alive)
+
+        return [record for index, record in enumerate(program) if index not in removed]
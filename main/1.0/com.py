@@ -1,6 +1,11 @@
 # PyXE Compiler
 
+import gc
+import os
+import re
 import struct
+import peephole
+import symbols
 
 class main:
     INSTRUCTION_OPCODES = {
@@ -11,6 +16,15 @@ class main:
         'PRINT': 0x66
     }
 
+    INSTRUCTION_OPCODES_V2 = dict(INSTRUCTION_OPCODES)
+    INSTRUCTION_OPCODES_V2.update({'JMP.S': 0x71, 'JE.S': 0x81, 'JNE.S': 0x91, 'CALL.S': 0xA1})
+
+    SHORT_JUMPS = {'JMP': 'JMP.S', 'JE': 'JE.S', 'JNE': 'JNE.S', 'CALL': 'CALL.S'}
+    PAIRS = ('MOV', 'ADD', 'SUB', 'CMP', 'AND', 'OR', 'XOR')
+    COMPACT = set(PAIRS) | {'PRINT', 'JMP.S', 'JE.S', 'JNE.S', 'CALL.S'}
+    OPERAND_COUNTS = dict.fromkeys(PAIRS, 2)
+    OPERAND_COUNTS.update(dict.fromkeys(('INC', 'DEC', 'PUSH', 'POP', 'INPUT', 'JMP', 'JE', 'JNE', 'CALL', 'INT'), 1))
+
     REGISTER_CODES = {
         'ACCUMULATOR': 0x01,
         'BASE': 0x02,
@@ -46,129 +60,337 @@ class main:
         'print': 'PRINT',
         'defbyte': 'DB',
         'defword': 'DW',
-        'defdouble': 'DD'
+        'defdouble': 'DD',
+        'reserve-bytes': 'RESB',
+        'reserve-doubles': 'RESD',
+        'include-binary': 'INCBIN',
+        'copy-memory': 'MEMCPY',
+        'fill-memory': 'MEMSET',
+        'compare-memory': 'MEMCMP',
+        'string-length': 'STRLEN',
+        'copy-string': 'STRCPY'
+    }
+
+    SYSCALL_COMMANDS = {
+        'MEMCPY': (20, ('BASE', 'COUNT', 'DATA')),
+        'MEMSET': (21, ('BASE', 'COUNT', 'DATA')),
+        'MEMCMP': (22, ('BASE', 'COUNT', 'DATA')),
+        'STRLEN': (23, ('BASE',)),
+        'STRCPY': (24, ('BASE', 'COUNT'))
     }
 
-    def __init__(self):
+    DATA_WIDTHS = {'DB': 1, 'DW': 2, 'DD': 4, 'RESB': 1, 'RESD': 4, 'INCBIN': 1}
+    DATA_FORMATS = {1: 'B', 2: 'H', 4: 'I'}
+    DATA_ITEM = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[^,\s][^,]*')
+    DATA_LABEL = re.compile(r'([A-Za-z_.][\w.\-]*)\s*:\s*(.*)$')
+    ESCAPE = re.compile(r'\\(.)')
+    ESCAPES = {'n': '\n', 't': '\t', '0': '\0'}
+    INCLUDE = re.compile(r'^[^;\n]*?\b(?:incbin|include-binary)\s+(?:[A-Za-z_.][\w.\-]*\s*:\s*)?([^;\n]*)', re.I | re.M)
+
+    LABEL = re.compile(r'[A-Za-z_.][\w.\-]*$')
+    NUMBER_START = set('0123456789+-')
+    INDIRECT = re.compile(r'([A-Za-z]+)(?:([+-])(\w+)(?:\*(\w+))?)?$')
+    SCALES = (1, 2, 4, 8)
+
+    def __init__(self, optimize=0, version=1):
+        self.optimize = optimize
+        self.version = version
         self.code_section = bytearray()
         self.data_section = bytearray()
+        self.reset()
+
+    def reset(self):
+        self.optimizer = None
+        self.program = None
+        del self.code_section[:]
+        del self.data_section[:]
         self.labels = {}
+        self.lines = {}
+        self.symbols = symbols.main()
+        self.fixups = []
         self.data_address = 0x2000
         self.code_address = 0x1000
         self.current_address = 0x1000
+        self.bss = 0
 
-    def compile(self, source):
-        lines = source.splitlines()
-        cleaned_lines = []
-
-        for line in lines:
+    def compile(self, source, filename=None):
+        self.reset()
+        self.folder = self.source_folder(filename)
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            program = self.parse(source)
+            if self.optimize:
+                self.optimizer = peephole.main(self.optimize,
+                                               self.compact_size if self.version == 2 else peephole.instruction_size)
+                program = self.optimizer.optimize(program)
+            self.program = program
+            if self.version == 2:
+                program = self.relax(program)
+            self.emit(program)
+            self.map_source(source)
+        finally:
+            if collecting:
+                gc.enable()
+
+        result = {
+            'code': bytes(self.code_section),
+            'data': bytes(self.data_section),
+            'bss': self.bss,
+            'labels': self.labels,
+            'symbols': self.symbols,
+            'version': self.version
+        }
+        if self.optimizer:
+            result['optimized'] = {'instructions': self.optimizer.removed, 'bytes': self.optimizer.saved}
+        return result
+
+    def parse(self, source):
+        program = []
+        append = program.append
+        commands = self.CUSTOM_COMMANDS
+        opcodes = self.INSTRUCTION_OPCODES
+        label_match = self.LABEL.match
+        constants = {}
+
+        for line_no, line in enumerate(source.splitlines(), 1):
             if ';' in line:
                 line = line.split(';', 1)[0]
             line = line.strip()
-            if line:
-                cleaned_lines.append(line)
-        lines = cleaned_lines
-
-        current_code_addr = self.code_address
-        current_data_addr = self.data_address
+            if not line:
+                continue
 
-        for i, line in enumerate(lines):
             if ':' in line:
-                parts = line.split(':', 1)
-                label = parts[0].strip()
-                line_rest = parts[1].strip()
-                if i + 1 < len(lines) and lines[i + 1].strip().upper().startswith('DB'):
-                    self.labels[label] = current_data_addr
-                else:
-                    self.labels[label] = current_code_addr
-                if not line_rest:
-                    continue
-                else:
-                    line = line_rest
+                label, line_rest = line.split(':', 1)
+                label = label.strip()
+                if label_match(label):
+                    append((line_no, 'label', label, None))
+                    line = line_rest.strip()
+                    if not line:
+                        continue
 
             if ' equ ' in line:
-                parts = line.split(' equ ', 1)
-                if len(parts) == 2:
-                    label = parts[0].strip()
-                    value_str = parts[1].strip()
-                    try:
-                        value = int(value_str, 0)
-                    except:
-                        value = 0
-                    self.labels[label] = value
-
-            elif line.upper().startswith('DB'):
-                data_str = line[2:].strip()
-                values = [v.strip() for v in data_str.split(',') if v.strip()]
-                current_data_addr += len(values)
+                label, value_str = line.split(' equ ', 1)
+                try:
+                    value = int(value_str.strip(), 0)
+                except:
+                    value = 0
+                append((line_no, 'equ', label.strip(), value))
+                constants[label.strip()] = value
+                continue
 
+            parts = line.split(None, 1)
+            original_mnemonic = parts[0]
+            mnemonic = commands.get(original_mnemonic) or original_mnemonic.upper()
+            rest = parts[1] if len(parts) > 1 else ''
+
+            if mnemonic in self.DATA_WIDTHS:
+                named = self.DATA_LABEL.match(rest)
+                if named:
+                    append((line_no, 'label', named.group(1), None))
+                    rest = named.group(2)
+                append((line_no, 'data', self.parse_data(mnemonic, rest, constants), mnemonic))
+            elif mnemonic in self.SYSCALL_COMMANDS:
+                number, registers = self.SYSCALL_COMMANDS[mnemonic]
+                operands = [operand.strip() for operand in rest.split(',')] if rest else []
+                moves = self.order_moves([(register, operand) for register, operand in zip(registers, operands)
+                                          if operand.upper() != register])
+                if moves is None:
+                    print(f"Syntax error: overlapping operands in '{line}'")
+                    continue
+                for register, operand in moves:
+                    append((line_no, 'ins', 'MOV', (register, operand)))
+                append((line_no, 'ins', 'MOV', ('ACCUMULATOR', str(number))))
+                append((line_no, 'ins', 'INT', ('0x80',)))
+            elif mnemonic not in opcodes:
+                print(f"Syntax error: '{original_mnemonic}'")
+            elif mnemonic == 'PRINT':
+                append((line_no, 'ins', mnemonic, (' '.join(rest.split()),) if rest else ()))
             else:
-                parts = line.split()
-                if parts:
-                    original_mnemonic = parts[0]
-                    if original_mnemonic in self.CUSTOM_COMMANDS:
-                        mnemonic = self.CUSTOM_COMMANDS[original_mnemonic]
-                    else:
-                        mnemonic = original_mnemonic.upper()
-
-                    if mnemonic in ['HLT', 'NOP', 'RET']:
-                        current_code_addr += 1
-                    elif mnemonic in ['INC', 'DEC', 'PUSH', 'POP', 'INPUT']:
-                        current_code_addr += 2
-                    elif mnemonic in ['INT', 'PRINT']:
-                        current_code_addr += 2
-                    elif mnemonic in ['JMP', 'JE', 'JNE', 'CALL']:
-                        current_code_addr += 5
-                    else:
-                        current_code_addr += 11
-
-        current_data_addr = self.data_address
-        for i, line in enumerate(lines):
-            if line.upper().startswith('DB'):
-                if i > 0 and ':' in lines[i - 1]:
-                    label = lines[i - 1].split(':', 1)[0].strip()
-                    self.labels[label] = current_data_addr
-                data_str = line[2:].strip()
-                values = [v.strip() for v in data_str.split(',') if v.strip()]
-                current_data_addr += len(values)
-
-        for line in lines:
-            if ':' in line or line.upper().startswith('DB') or ' equ ' in line:
-                continue
-            self.compile_instruction(line)
-          
-        for line in lines:
-            if line.upper().startswith('DB'):
-                self.compile_data(line)
+                operands = tuple(operand.strip() for operand in rest.split(',')) if rest else ()
+                if len(operands) != self.OPERAND_COUNTS.get(mnemonic, len(operands)):
+                    print(f"Syntax error: line {line_no}: wrong number of operands in '{line}'")
+                    continue
+                append((line_no, 'ins', mnemonic, operands))
 
-        return {
-            'code': bytes(self.code_section),
-            'data': bytes(self.data_section),
-            'labels': self.labels
-        }
+        return program
 
-    def compile_instruction(self, line):
-        parts = line.split()
-        if not parts:
-            return
+    def operand_registers(self, operand):
+        return {name for name in re.split(r'[^A-Z]+', operand.upper()) if name in self.REGISTER_CODES}
 
-        original_mnemonic = parts[0]
+    def order_moves(self, moves):
+        ordered = []
+        while moves:
+            for index, (target, operand) in enumerate(moves):
+                if not any(target in self.operand_registers(other) for position, (other_target, other) in enumerate(moves)
+                           if position != index):
+                    ordered.append(moves.pop(index))
+                    break
+            else:
+                if any('ACCUMULATOR' in self.operand_registers(operand) for target, operand in moves):
+                    return None
+                ordered.append(('ACCUMULATOR', moves[0][1]))
+                moves[0] = (moves[0][0], 'ACCUMULATOR')
+        return ordered
+
+    def emit(self, program):
+        pending = []
+        reserved = []
+
+        for line_no, kind, first, second in program:
+            if kind == 'label':
+                pending.append(first)
+                continue
 
-        if original_mnemonic in self.CUSTOM_COMMANDS:
-            mnemonic = self.CUSTOM_COMMANDS[original_mnemonic]
-        else:
-            mnemonic = original_mnemonic.upper()
+            if pending and kind == 'data' and isinstance(first, int):
+                reserved.extend((label, self.bss) for label in pending)
+                pending = []
+            elif pending:
+                if kind == 'data':
+                    address = self.data_address + len(self.data_section)
+                    section = 'data'
+                else:
+                    address = self.code_address + len(self.code_section)
+                    section = 'code'
+                for label in pending:
+                    self.labels[label] = address
+                    self.symbols.define(label, address, section)
+                pending = []
+
+            if kind == 'equ':
+                self.labels[first] = second
+                self.symbols.define(first, second, 'const')
+            elif kind == 'data':
+                self.compile_data(first, second)
+            else:
+                self.lines[self.code_address + len(self.code_section)] = line_no
+                self.compile_instruction(first, second)
+
+        bss_start = self.data_address + len(self.data_section)
+        for label, offset in reserved:
+            self.labels[label] = bss_start + offset
+            self.symbols.define(label, bss_start + offset, 'data')
+
+        for label in pending:
+            self.labels[label] = self.code_address + len(self.code_section)
+            self.symbols.define(label, self.labels[label], 'code')
+
+        self.patch()
+
+    def map_source(self, source):
+        source_lines = source.splitlines()
+        label_match = self.LABEL.match
+        locate = self.symbols.locate
+        for address, line_no in self.lines.items():
+            line = source_lines[line_no - 1]
+            start = 0
+            if ':' in line:
+                label, rest = line.split(':', 1)
+                if label_match(label.strip()):
+                    start = len(label) + 1
+            column = len(line) - len(line[start:].lstrip()) + 1
+            locate(address, line_no, column)
+
+    def relax(self, program):
+        defined = {}
+        for line_no, kind, first, second in program:
+            if kind == 'label':
+                defined[first] = defined.get(first, 0) + 1
+
+        short = {index for index, (line_no, kind, first, second) in enumerate(program)
+                 if kind == 'ins' and first in self.SHORT_JUMPS and second and defined.get(second[0]) == 1}
+
+        while short:
+            labels = {}
+            starts = {}
+            pending = []
+            address = self.code_address
+            for index, (line_no, kind, first, second) in enumerate(program):
+                if kind == 'label':
+                    pending.append(first)
+                    continue
+                if kind != 'data':
+                    for label in pending:
+                        labels[label] = address
+                pending = []
+                if kind == 'ins':
+                    starts[index] = address
+                    address += 2 if index in short else self.compact_size(first, second)
+            for label in pending:
+                labels[label] = address
+
+            far = {index for index in short
+                   if program[index][3][0] not in labels or
+                   not -128 <= labels[program[index][3][0]] - (starts[index] + 2) <= 127}
+            if not far:
+                break
+            short -= far
+
+        return [(line_no, kind, self.SHORT_JUMPS[first], second) if index in short else (line_no, kind, first, second)
+                for index, (line_no, kind, first, second) in enumerate(program)]
+
+    def compact_size(self, mnemonic, operands):
+        if mnemonic in self.PAIRS:
+            operands = (tuple(operands[:2]) + ('', ''))[:2]
+            if all(operand.upper() in self.REGISTER_CODES for operand in operands):
+                return 3
+            return 2 + sum(self.operand_size(operand) for operand in operands)
+        if mnemonic == 'PRINT':
+            if not operands:
+                return 3
+            if operands[0][:1] in ('"', "'") and operands[0].endswith(operands[0][:1]):
+                return 6
+            return 2 + self.operand_size(operands[0])
+        if mnemonic in self.SHORT_JUMPS:
+            return 5 if operands else 1
+        if mnemonic in ('INC', 'DEC', 'PUSH', 'POP', 'INPUT', 'INT'):
+            return 2 if operands else 1
+        return 1
+
+    def operand_size(self, operand):
+        if operand.upper() in self.REGISTER_CODES:
+            return 1
+        address = self.indirect(operand)
+        if address:
+            return 5 if address[0] == 'IND' and not -128 <= address[2] <= 127 else 2
+        if operand[:1] in self.NUMBER_START:
+            try:
+                return 1 if 0 <= int(operand, 0) & 0xFFFFFFFF <= 0xFF else 4
+            except ValueError:
+                pass
+        return 4
+
+    def patch(self):
+        for kind, offset, name, form in self.fixups:
+            value = self.labels.get(name)
+            if kind == 'address':
+                struct.pack_into('<I', self.code_section, offset, (value or 0) & 0xFFFFFFFF)
+            elif kind == 'relative':
+                self.code_section[offset] = (value - (self.code_address + offset + 1)) & 0xFF
+            elif kind == 'data':
+                self.data_section[offset:offset + form] = ((value or 0) & ((1 << 8 * form) - 1)).to_bytes(form, 'little')
+            elif kind == 'compact':
+                if value is None:
+                    self.code_section[form[0]] &= ~(0x0F << form[1]) & 0xFF
+                else:
+                    struct.pack_into('<I', self.code_section, offset, value & 0xFFFFFFFF)
+            elif value is None:
+                self.code_section[offset] = 0x00
+            else:
+                struct.pack_into('<I', self.code_section, offset + 1, value & 0xFFFFFFFF)
+        self.fixups = []
 
-        if mnemonic not in self.INSTRUCTION_OPCODES:
-            print(f"Syntax error: '{parts[0]}'")
+    def compile_instruction(self, mnemonic, operands):
+        if self.version == 2 and mnemonic in self.COMPACT:
+            self.compile_compact(mnemonic, operands)
             return
 
         opcode = self.INSTRUCTION_OPCODES[mnemonic]
         self.code_section.append(opcode)
 
         if mnemonic == 'PRINT':
-            if len(parts) > 1:
-                operand_str = ' '.join(parts[1:])
+            if operands:
+                operand_str = operands[0]
                 if (operand_str.startswith('"') and operand_str.endswith('"')) or \
                         (operand_str.startswith("'") and operand_str.endswith("'")):
                     str_content = operand_str[1:-1]
@@ -185,142 +407,269 @@ class main:
                 self.code_section.extend(struct.pack('<I', 0))
             return
 
-        if mnemonic in ['MOV', 'ADD', 'SUB', 'CMP', 'AND', 'OR', 'XOR']:
-            for operand_str in parts[1:3]:
-                operand = operand_str.strip().rstrip(',')
+        if mnemonic in ('MOV', 'ADD', 'SUB', 'CMP', 'AND', 'OR', 'XOR'):
+            for operand in operands[:2]:
                 self.encode_operand(operand)
 
-        elif mnemonic in ['INC', 'DEC', 'PUSH', 'POP']:
-            if len(parts) > 1:
-                operand = parts[1].strip().rstrip(',')
-                reg_code = self.REGISTER_CODES.get(operand.upper(), 0)
+        elif mnemonic in ('INC', 'DEC', 'PUSH', 'POP', 'INPUT'):
+            if operands:
+                reg_code = self.REGISTER_CODES.get(operands[0].upper(), 0)
                 self.code_section.append(reg_code)
 
-        elif mnemonic in ['JMP', 'JE', 'JNE', 'CALL']:
-            if len(parts) > 1:
-                operand = parts[1].strip().rstrip(',')
-                address = self.labels.get(operand, 0)
-                self.code_section.extend(struct.pack('<I', address))
+        elif mnemonic in ('JMP', 'JE', 'JNE', 'CALL'):
+            if operands:
+                self.encode_address(operands[0])
 
         elif mnemonic == 'INT':
-            if len(parts) > 1:
+            if operands:
                 try:
-                    vector = int(parts[1].strip().rstrip(','), 0)
+                    vector = int(operands[0], 0)
                     self.code_section.append(vector & 0xFF)
                 except:
                     self.code_section.append(0)
 
-        elif mnemonic == 'INPUT':
-            if len(parts) > 1:
-                operand = parts[1].strip().rstrip(',')
-                reg_code = self.REGISTER_CODES.get(operand.upper(), 0)
-                self.code_section.append(reg_code)
+    def encode_address(self, name):
+        if name in self.labels:
+            address = self.labels[name] & 0xFFFFFFFF
+        else:
+            address = 0
+            self.fixups.append(('address', len(self.code_section), name, None))
+        self.code_section.extend(struct.pack('<I', address))
 
-    def encode_operand(self, operand):
-        if operand.upper() in self.REGISTER_CODES:
-            self.code_section.append(0x01)
-            self.code_section.append(self.REGISTER_CODES[operand.upper()])
-            self.code_section.extend(bytes(3))
-            return
+    def encode_reference(self, op_type, name):
+        if name in self.labels:
+            self.code_section.extend(struct.pack('<BI', op_type, self.labels[name] & 0xFFFFFFFF))
+        else:
+            self.fixups.append(('operand', len(self.code_section), name, None))
+            self.code_section.extend(struct.pack('<BI', op_type, 0))
 
-        try:
-            value = int(operand, 0)
-            self.code_section.append(0x02)
-            self.code_section.extend(struct.pack('<I', value))
+    def encode_operand(self, operand):
+        reg_code = self.REGISTER_CODES.get(operand.upper())
+        if reg_code is not None:
+            self.code_section.extend((0x01, reg_code, 0, 0, 0))
             return
-        except:
-            pass
 
-        if operand in self.labels:
-            value = self.labels[operand]
-            self.code_section.append(0x02)
-            self.code_section.extend(struct.pack('<I', value))
-            return
+        if operand[:1] in self.NUMBER_START:
+            try:
+                self.code_section.extend(struct.pack('<BI', 0x02, int(operand, 0) & 0xFFFFFFFF))
+                return
+            except ValueError:
+                pass
 
         if operand.startswith('[') and operand.endswith(']'):
+            address = self.indirect(operand)
+            if address is False:
+                print(f"Syntax error: '{operand}'")
+            elif address:
+                if address[0] == 'IND':
+                    self.code_section.extend(struct.pack('<BBi', 0x04, address[1], address[2])[:5])
+                else:
+                    self.code_section.extend((0x05, address[1], address[2], address[3], 0))
+                return
+
             addr_str = operand[1:-1].strip()
             try:
-                address = int(addr_str, 0)
-                self.code_section.append(0x03)
-                self.code_section.extend(struct.pack('<I', address))
+                self.code_section.extend(struct.pack('<BI', 0x03, int(addr_str, 0) & 0xFFFFFFFF))
+            except ValueError:
+                self.encode_reference(0x03, addr_str)
+            return
+
+        self.encode_reference(0x02, operand)
+
+    def compile_compact(self, mnemonic, operands):
+        code = self.code_section
+        code.append(self.INSTRUCTION_OPCODES_V2[mnemonic])
+
+        if mnemonic in self.PAIRS:
+            dest, src = (tuple(operands[:2]) + ('', ''))[:2]
+            dest_reg = self.REGISTER_CODES.get(dest.upper())
+            src_reg = self.REGISTER_CODES.get(src.upper())
+            if dest_reg is not None and src_reg is not None:
+                code.extend((0x11, dest_reg << 4 | src_reg))
                 return
-            except:
-                if addr_str in self.labels:
-                    address = self.labels[addr_str]
-                    self.code_section.append(0x03)
-                    self.code_section.extend(struct.pack('<I', address))
-                    return
-
-        self.code_section.append(0x00)
-        self.code_section.extend(bytes(4))
-
-    def compile_data(self, line):
-        data_str = line[2:].strip()
-        values = []
-        current = ''
-        in_quotes = False
-        quote_char = None
-        escape = False
-
-        for char in data_str:
-            if escape:
-                if char == 'n':
-                    current += '\n'
-                elif char == 't':
-                    current += '\t'
-                elif char == '0':
-                    current += '\x00'
-                else:
-                    current += char
-                escape = False
-            elif char == '\\':
-                escape = True
-            elif in_quotes:
-                if char == quote_char:
-                    values.append(quote_char + current + quote_char)
-                    current = ''
-                    in_quotes = False
-                else:
-                    current += char
+            form = len(code)
+            code.append(0)
+            code[form] = self.encode_compact(dest, form, 4) << 4
+            code[form] |= self.encode_compact(src, form, 0)
+
+        elif mnemonic == 'PRINT':
+            if not operands:
+                code.extend((0x04, 0))
+            elif operands[0][:1] in ('"', "'") and operands[0].endswith(operands[0][:1]):
+                str_addr = self.data_address + len(self.data_section)
+                self.data_section.extend(operands[0][1:-1].encode('utf-8'))
+                self.data_section.append(0)
+                code.extend(struct.pack('<BI', 0x02, str_addr))
             else:
-                if char in ('"', "'"):
-                    in_quotes = True
-                    quote_char = char
-                elif char == ',':
-                    if current.strip():
-                        values.append(current.strip())
-                    current = ''
-                else:
-                    current += char
+                form = len(code)
+                code.append(0)
+                code[form] = self.encode_compact(operands[0], form, 0)
 
-        if current.strip():
-            values.append(current.strip())
+        else:
+            name = operands[0]
+            if name in self.labels:
+                code.append((self.labels[name] - (self.code_address + len(code) + 1)) & 0xFF)
+            else:
+                self.fixups.append(('relative', len(code), name, None))
+                code.append(0)
 
-        for val in values:
-            if (val.startswith("'") and val.endswith("'")) or (val.startswith('"') and val.endswith('"')):
-                content = val[1:-1]
-                for char in content:
-                    self.data_section.append(ord(char))
-            elif val.startswith('0x'):
-                try:
-                    self.data_section.append(int(val, 16))
-                except:
-                    self.data_section.append(0)
-            elif val.isdigit():
-                try:
-                    self.data_section.append(int(val))
-                except:
-                    self.data_section.append(0)
-            elif val == '\\n':
-                self.data_section.append(10)
-            elif val == '\\t':
-                self.data_section.append(9)
-            elif val == '\\0':
-                self.data_section.append(0)
-            elif val == '0':
-                self.data_section.append(0)
+    def encode_compact(self, operand, form, shift):
+        code = self.code_section
+        reg_code = self.REGISTER_CODES.get(operand.upper())
+        if reg_code is not None:
+            code.append(reg_code)
+            return 0x01
+
+        if operand[:1] in self.NUMBER_START:
+            try:
+                value = int(operand, 0) & 0xFFFFFFFF
+                if value <= 0xFF:
+                    code.append(value)
+                    return 0x04
+                code.extend(struct.pack('<I', value))
+                return 0x02
+            except ValueError:
+                pass
+
+        op_type = 0x02
+        if operand.startswith('[') and operand.endswith(']'):
+            address = self.indirect(operand)
+            if address is False:
+                print(f"Syntax error: '{operand}'")
+            elif address and address[0] == 'IDX':
+                code.extend((address[1] << 4 | address[2], address[3]))
+                return 0x07
+            elif address:
+                if -128 <= address[2] <= 127:
+                    code.extend(struct.pack('<Bb', address[1], address[2]))
+                    return 0x05
+                code.extend(struct.pack('<Bi', address[1], address[2]))
+                return 0x06
+
+            operand = operand[1:-1].strip()
+            op_type = 0x03
+            try:
+                code.extend(struct.pack('<I', int(operand, 0) & 0xFFFFFFFF))
+                return op_type
+            except ValueError:
+                pass
+
+        if not operand:
+            code.extend(struct.pack('<I', 0))
+            return 0x00
+        if operand in self.labels:
+            code.extend(struct.pack('<I', self.labels[operand] & 0xFFFFFFFF))
+        else:
+            self.fixups.append(('compact', len(code), operand, (form, shift)))
+            code.extend(struct.pack('<I', 0))
+        return op_type
+
+    def indirect(self, operand):
+        if not (operand.startswith('[') and operand.endswith(']')):
+            return None
+        match = self.INDIRECT.match(''.join(operand[1:-1].split()))
+        if match is None:
+            return None
+        base, sign, other, scale = match.groups()
+        base = self.REGISTER_CODES.get(base.upper())
+        if base is None:
+            return None
+        if other is None:
+            return ('IND', base, 0)
+
+        index = self.REGISTER_CODES.get(other.upper())
+        try:
+            if index is not None and sign == '+':
+                scale = int(scale, 0) if scale else 1
+                if scale in self.SCALES:
+                    return ('IDX', base, index, scale)
+            elif index is None and scale is None:
+                disp = int(other, 0) * (-1 if sign == '-' else 1)
+                if -0x800000 <= disp < 0x800000:
+                    return ('IND', base, disp)
+        except ValueError:
+            pass
+        return False
+
+    def source_folder(self, filename):
+        return os.path.dirname(os.path.abspath(filename)) if filename else os.getcwd()
+
+    def includes(self, source, filename=None):
+        folder = self.source_folder(filename)
+        return [os.path.join(folder, name.strip().strip('"\'')) for name in self.INCLUDE.findall(source)]
+
+    def parse_data(self, directive, text, constants):
+        text = text.strip()
+        if directive == 'INCBIN':
+            name = text.strip('"\'')
+            try:
+                with open(os.path.join(self.folder, name), 'rb') as f:
+                    return f.read()
+            except OSError as e:
+                print(f"Include error: '{name}': {e.strerror}")
+                return b''
+
+        if directive in ('RESB', 'RESD'):
+            count = self.data_number(text, constants)
+            if count is None or count < 0:
+                print(f"Syntax error: '{text}'")
+                return 0
+            return count
+
+        mask = (1 << 8 * self.DATA_WIDTHS[directive]) - 1
+        if '"' not in text and "'" not in text:
+            try:
+                return tuple(int(item, 0) & mask for item in text.split(',')) if text else ()
+            except ValueError:
+                pass
+
+        values = []
+        for item in self.DATA_ITEM.findall(text):
+            item = item.strip()
+            if len(item) > 1 and item[0] in '"\'' and item[-1] == item[0]:
+                content = self.ESCAPE.sub(self.unescape, item[1:-1])
+                values.extend(content.encode('utf-8') if mask == 0xFF else (ord(char) & mask for char in content))
+                continue
+            value = self.data_number(item, constants)
+            if value is not None:
+                values.append(value & mask)
+            elif len(item) == 2 and item[0] == '\\':
+                values.append(ord(self.ESCAPES.get(item[1], item[1])) & mask)
             else:
-                try:
-                    self.data_section.append(ord(val))
-                except:
-                    self.data_section.append(0)
+                values.append(item)
+        return tuple(values)
+
+    def data_number(self, text, constants):
+        try:
+            return int(text, 0)
+        except ValueError:
+            pass
+        try:
+            return int(text)
+        except ValueError:
+            return constants.get(text)
+
+    def unescape(self, match):
+        return self.ESCAPES.get(match.group(1), match.group(1))
+
+    def compile_data(self, values, directive):
+        width = self.DATA_WIDTHS[directive]
+        if isinstance(values, int):
+            self.bss += values * width
+            return
+        if directive == 'INCBIN':
+            self.data_section += values
+            return
+
+        start = len(self.data_section)
+        if any(isinstance(value, str) for value in values):
+            values = [self.data_label(value, start + index * width, width) if isinstance(value, str) else value
+                      for index, value in enumerate(values)]
+        self.data_section += struct.pack(f'<{len(values)}{self.DATA_FORMATS[width]}', *values)
+
+    def data_label(self, name, offset, width):
+        value = self.labels.get(name)
+        if value is None:
+            self.fixups.append(('data', offset, name, width))
+            return 0
+        return value & ((1 << 8 * width) - 1)
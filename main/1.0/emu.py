@@ -1,9 +1,32 @@
 # PyXE x86 Assembly Emulator
 
-import struct
 import sys
+import time
+import jit
+import paging
+import terminal
+from alu import MASK, ZF, flags_add, flags_sub, flags_logic, flags_inc, flags_dec
+from collections.abc import Mapping
+
+class register_view(Mapping):
+    def __init__(self, regs, names):
+        self.regs = regs
+        self.names = names
+
+    def __getitem__(self, name):
+        return self.regs[self.names[name]]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
 
 class main:
+    CODE_START = 0x1000
+    MAX_INSTRUCTION = 11
+    BATCH = 4096
+
     REGISTERS = {
         0x01: 'ACCUMULATOR',
         0x02: 'BASE',
@@ -15,14 +38,21 @@ class main:
         0x08: 'STACKPOINTER'
     }
 
-    def __init__(self, mem_size=1024 * 1024):
-        self.registers = {name: 0 for name in self.REGISTERS.values()}
+    REGISTER_CODES = {name: code for code, name in REGISTERS.items()}
+    STACKPOINTER = 0x08
+
+    def __init__(self, mem_size=1024 * 1024, use_jit=False, console=None, memory=None):
+        self.regs = [0] * (len(self.REGISTERS) + 1)
+        self.registers = register_view(self.regs, self.REGISTER_CODES)
         self.eip = 0x1000
         self.eflags = 0
-        self.memory = bytearray(mem_size)
+        self.memory = memory if memory is not None else paging.flat(mem_size)
+        self.console = console or terminal.main()
         self.running = False
+        self.status = 'ready'
+        self.exit_code = None
         self.interrupts = {}
-        self.registers['STACKPOINTER'] = mem_size - 4
+        self.regs[self.STACKPOINTER] = len(self.memory) - 4
         self.code_end = 0x1000
 
         self.instruction_handlers = {
@@ -48,254 +78,487 @@ class main:
             0xE0: self.handle_int,
             0xF0: self.handle_hlt
         }
+        for short, near in ((0x71, 0x70), (0x81, 0x80), (0x91, 0x90), (0xA1, 0xA0)):
+            self.instruction_handlers[short] = self.instruction_handlers[near]
+
+        self.instruction_decoders = {
+            0x00: self.decode_none,
+            0x10: self.decode_pair,
+            0x20: self.decode_pair,
+            0x22: self.decode_pair,
+            0x30: self.decode_pair,
+            0x33: self.decode_pair,
+            0x40: self.decode_register,
+            0x44: self.decode_pair,
+            0x50: self.decode_register,
+            0x55: self.decode_register,
+            0x60: self.decode_pair,
+            0x66: self.decode_single,
+            0x70: self.decode_address,
+            0x80: self.decode_address,
+            0x90: self.decode_address,
+            0xA0: self.decode_address,
+            0xB0: self.decode_none,
+            0xC0: self.decode_register,
+            0xD0: self.decode_register,
+            0xE0: self.decode_byte,
+            0xF0: self.decode_none
+        }
 
-    def load_program(self, code, data, labels):
-        code_start = 0x1000
-        for i, byte in enumerate(code):
-            self.memory[code_start + i] = byte
+        compact = dict(self.instruction_decoders)
+        compact.update({
+            0x10: self.decode_compact_pair,
+            0x20: self.decode_compact_pair,
+            0x22: self.decode_compact_pair,
+            0x30: self.decode_compact_pair,
+            0x33: self.decode_compact_pair,
+            0x44: self.decode_compact_pair,
+            0x60: self.decode_compact_pair,
+            0x66: self.decode_compact_single,
+            0x71: self.decode_relative,
+            0x81: self.decode_relative,
+            0x91: self.decode_relative,
+            0xA1: self.decode_relative
+        })
+        self.formats = {1: self.instruction_decoders, 2: compact}
+        self.version = 1
+        self.symbols = None
+
+        self.decoded = {}
+        self.blocks = {}
+        self.jit = jit.main(self) if use_jit else None
+
+    def load_program(self, code, data, labels, version=1, symbols=None):
+        self.version = version
+        self.symbols = symbols
+        self.instruction_decoders = self.formats[version]
+        code_start = self.CODE_START
+        self.memory.load(code_start, code)
         self.code_end = code_start + len(code)
 
         data_start = 0x2000
-        for i, byte in enumerate(data):
-            self.memory[data_start + i] = byte
+        self.memory.load(data_start, data)
 
+        self.decoded.clear()
+        self.blocks.clear()
         self.eip = code_start
 
+    def reset(self):
+        self.memory.reset()
+        self.regs[:] = [0] * len(self.regs)
+        self.regs[self.STACKPOINTER] = len(self.memory) - 4
+        self.eip = self.CODE_START
+        self.eflags = 0
+        self.running = False
+        self.status = 'ready'
+        self.exit_code = None
+        self.code_end = self.CODE_START
+        self.version = 1
+        self.symbols = None
+        self.instruction_decoders = self.formats[1]
+        self.decoded.clear()
+        self.blocks.clear()
+
+    def fork(self, console=None):
+        child = main(use_jit=self.jit is not None, console=console or self.console, memory=self.memory.clone())
+        child.regs[:] = self.regs
+        child.eip = self.eip
+        child.eflags = self.eflags
+        child.exit_code = self.exit_code
+        child.code_end = self.code_end
+        child.interrupts = dict(self.interrupts)
+        child.version = self.version
+        child.symbols = self.symbols
+        child.instruction_decoders = child.formats[self.version]
+        return child
+
     def register_interrupt(self, vector, handler):
         self.interrupts[vector] = handler
 
     def read_memory(self, address, size):
         if address < 0 or address + size > len(self.memory):
-            print(f"Memory warning: Invalid memory access at 0x{address:08X}, size={size}")
+            self.console.writeline(f"Memory warning: Invalid memory access at 0x{address:08X}, size={size}")
             return bytes([0] * size)
-        return bytes(self.memory[address:address + size])
+        return bytes(self.memory.read(address, size))
 
     def write_memory(self, address, data):
         if address < 0 or address + len(data) > len(self.memory):
-            print(f"Memory warning: Invalid memory write at 0x{address:08X}, size={len(data)}")
+            self.console.writeline(f"Memory warning: Invalid memory write at 0x{address:08X}, size={len(data)}")
             return
-        for i, byte in enumerate(data):
-            self.memory[address + i] = byte
+        self.memory.write(address, data)
+        self.touch_code(address, len(data))
 
-    def run(self):
-        self.running = True
-        while self.running:
-            if self.eip >= self.code_end:
-                print(f"Execution reached end of code at 0x{self.eip:08X}")
-                self.running = False
-                break
+    def touch_code(self, address, size):
+        if address < self.code_end + self.MAX_INSTRUCTION and address + size > self.CODE_START:
+            self.decoded.clear()
+            self.blocks.clear()
 
-            opcode = self.memory[self.eip]
-            self.eip += 1
+    def run(self, steps=None, deadline=None):
+        try:
+            if self.jit:
+                return self.run_blocks(steps, deadline)
+            return self.run_decoded(steps, deadline)
+        finally:
+            self.console.flush()
 
-            if opcode in self.instruction_handlers:
-                self.instruction_handlers[opcode]()
+    def run_decoded(self, steps=None, deadline=None):
+        self.running = True
+        self.status = 'running'
+        decoded = self.decoded
+        eip = self.eip
+        executed = 0
+        try:
+            if steps is None and deadline is None:
+                while self.running:
+                    eip = self.eip
+                    entry = decoded.get(eip)
+                    if entry is None:
+                        entry = decoded[eip] = self.decode(eip)
+                    handler, args, self.eip = entry
+                    handler(*args)
+                self.status = 'halted'
+                return None
+
+            while self.running:
+                limit = executed + self.BATCH if steps is None else min(executed + self.BATCH, steps)
+                while self.running and executed < limit:
+                    eip = self.eip
+                    entry = decoded.get(eip)
+                    if entry is None:
+                        entry = decoded[eip] = self.decode(eip)
+                    handler, args, self.eip = entry
+                    handler(*args)
+                    executed += 1
+                if self.running and self.preempt(executed, steps, deadline):
+                    break
+            else:
+                self.status = 'halted'
+            return executed
+        except terminal.Blocked:
+            self.eip = eip
+            self.status = 'blocked'
+            return None if steps is None and deadline is None else executed
+
+    def run_blocks(self, steps=None, deadline=None):
+        self.running = True
+        self.status = 'running'
+        blocks = self.blocks
+        compile_block = self.jit.compile_block
+        block = None
+        executed = 0
+        try:
+            if steps is None and deadline is None:
+                while self.running:
+                    block = blocks.get(self.eip)
+                    if block is None:
+                        block = blocks[self.eip] = compile_block(self.eip)
+                    block()
+                self.status = 'halted'
+                return None
+
+            while self.running:
+                limit = executed + self.BATCH if steps is None else min(executed + self.BATCH, steps)
+                while self.running and executed < limit:
+                    block = blocks.get(self.eip)
+                    if block is None:
+                        block = blocks[self.eip] = compile_block(self.eip)
+                    block()
+                    executed += block.count
+                if self.running and self.preempt(executed, steps, deadline):
+                    break
             else:
-                print(f"Syntax error: 0x{opcode:02X} at 0x{self.eip - 1:08X}")
-                self.running = False
+                self.status = 'halted'
+            return executed
+        except terminal.Blocked:
+            self.eip = block.last
+            self.status = 'blocked'
+            return None if steps is None and deadline is None else executed
+
+    def preempt(self, executed, steps, deadline):
+        if steps is not None and executed >= steps:
+            self.status = 'steps'
+            return True
+        if deadline is not None and time.perf_counter() >= deadline:
+            self.status = 'timeout'
+            return True
+        return False
+
+    def decode(self, address):
+        if address >= self.code_end:
+            return (self.handle_end, (), address)
+
+        opcode = self.memory[address]
+        if opcode not in self.instruction_decoders:
+            return (self.handle_invalid, (opcode,), address + 1)
+
+        args, next_address = self.instruction_decoders[opcode](address + 1)
+        return (self.instruction_handlers[opcode], args, next_address)
+
+    def decode_none(self, address):
+        return (), address
+
+    def decode_byte(self, address):
+        return (self.memory[address],), address + 1
+
+    def decode_register(self, address):
+        return (self.get_reg_code(self.memory[address]),), address + 1
+
+    def decode_address(self, address):
+        return (self.memory.load32(address),), address + 4
+
+    def decode_single(self, address):
+        operand, address = self.decode_operand(address)
+        return (operand,), address
+
+    def decode_pair(self, address):
+        dest, address = self.decode_operand(address)
+        src, address = self.decode_operand(address)
+        return (dest, src), address
+
+    def decode_operand(self, address):
+        op_type = self.memory[address]
+        address += 1
 
-    def read_operand_type(self):
-        op_type = self.memory[self.eip]
-        self.eip += 1
+        if op_type == 0x01:
+            return ('REG', self.get_reg_code(self.memory[address])), address + 4
+
+        elif op_type == 0x02:
+            return ('IMM', self.memory.load32(address)), address + 4
 
+        elif op_type == 0x03:
+            return ('MEM', self.memory.load32(address)), address + 4
+
+        elif op_type == 0x04:
+            word = self.memory.load32(address)
+            disp = word >> 8
+            return ('IND', self.get_reg_code(word & 0xFF), disp - 0x1000000 if disp & 0x800000 else disp), address + 4
+
+        elif op_type == 0x05:
+            memory = self.memory
+            return ('IDX', self.get_reg_code(memory[address]), self.get_reg_code(memory[address + 1]),
+                    memory[address + 2]), address + 4
+
+        else:
+            return ('UNK', 0), address + 4
+
+    def decode_relative(self, address):
+        offset = self.memory[address]
+        return (address + 1 + (offset - 0x100 if offset & 0x80 else offset),), address + 1
+
+    def decode_compact_single(self, address):
+        operand, address = self.decode_compact(self.memory[address] & 0x0F, address + 1)
+        return (operand,), address
+
+    def decode_compact_pair(self, address):
+        form = self.memory[address]
+        if form == 0x11:
+            pair = self.memory[address + 1]
+            return (('REG', self.get_reg_code(pair >> 4)), ('REG', self.get_reg_code(pair & 0x0F))), address + 2
+        dest, address = self.decode_compact(form >> 4, address + 1)
+        src, address = self.decode_compact(form & 0x0F, address)
+        return (dest, src), address
+
+    def decode_compact(self, op_type, address):
         if op_type == 0x01:
-            reg_code = self.memory[self.eip]
-            self.eip += 1
-            self.eip += 3
-            return ('REG', reg_code)
+            return ('REG', self.get_reg_code(self.memory[address])), address + 1
+
+        elif op_type == 0x04:
+            return ('IMM', self.memory[address]), address + 1
 
         elif op_type == 0x02:
-            data = self.memory[self.eip:self.eip + 4]
-            self.eip += 4
-            value = struct.unpack('<I', bytes(data))[0]
-            return ('IMM', value)
+            return ('IMM', self.memory.load32(address)), address + 4
 
         elif op_type == 0x03:
-            data = self.memory[self.eip:self.eip + 4]
-            self.eip += 4
-            address = struct.unpack('<I', bytes(data))[0]
-            return ('MEM', address)
+            return ('MEM', self.memory.load32(address)), address + 4
+
+        elif op_type == 0x05:
+            disp = self.memory[address + 1]
+            return ('IND', self.get_reg_code(self.memory[address]), disp - 0x100 if disp & 0x80 else disp), address + 2
+
+        elif op_type == 0x06:
+            return ('IND', self.get_reg_code(self.memory[address]), self.memory.load32(address + 1)), address + 5
+
+        elif op_type == 0x07:
+            pair = self.memory[address]
+            return ('IDX', self.get_reg_code(pair >> 4), self.get_reg_code(pair & 0x0F),
+                    self.memory[address + 1]), address + 2
 
         else:
-            self.eip += 4
-            return ('UNK', 0)
+            return ('UNK', 0), address + 4
+
+    def where(self, address):
+        described = self.symbols.describe(address) if self.symbols is not None else ''
+        if not described:
+            return f"0x{address:08X}"
+        return f"0x{address:08X} ({described})"
 
     def get_reg_name(self, reg_code):
         return self.REGISTERS.get(reg_code, 'ACCUMULATOR')
 
+    def get_reg_code(self, reg_code):
+        return reg_code if reg_code in self.REGISTERS else 0x01
+
+    def set_register(self, name, value):
+        self.regs[self.REGISTER_CODES[name]] = value & MASK
+
     def get_value(self, operand):
         if operand[0] == 'REG':
-            return self.registers[self.get_reg_name(operand[1])]
+            return self.regs[operand[1]]
         elif operand[0] == 'IMM':
             return operand[1]
         elif operand[0] == 'MEM':
-            start_addr = operand[1]
-            end_addr = start_addr + 4
-            data = self.memory[start_addr:end_addr]
-            return struct.unpack('<I', bytes(data))[0]
+            return self.memory.load32(operand[1])
+        elif operand[0] == 'IND':
+            return self.memory.load32((self.regs[operand[1]] + operand[2]) & MASK)
+        elif operand[0] == 'IDX':
+            return self.memory.load32((self.regs[operand[1]] + self.regs[operand[2]] * operand[3]) & MASK)
         return 0
 
     def set_value(self, operand, value):
         if operand[0] == 'REG':
-            self.registers[self.get_reg_name(operand[1])] = value
+            self.regs[operand[1]] = value
         elif operand[0] == 'MEM':
-            start_addr = operand[1]
-            end_addr = start_addr + 4
-            packed_value = struct.pack('<I', value)
-            self.memory[start_addr:end_addr] = packed_value
+            self.memory.store32(operand[1], value)
+            self.touch_code(operand[1], 4)
+        elif operand[0] in ('IND', 'IDX'):
+            address = self.address(operand)
+            self.memory.store32(address, value)
+            self.touch_code(address, 4)
+
+    def address(self, operand):
+        if operand[0] == 'IND':
+            return (self.regs[operand[1]] + operand[2]) & MASK
+        return (self.regs[operand[1]] + self.regs[operand[2]] * operand[3]) & MASK
+
+    def handle_end(self):
+        self.console.writeline(f"Execution reached end of code at {self.where(self.eip)}")
+        self.running = False
+
+    def handle_invalid(self, opcode):
+        self.console.writeline(f"Syntax error: 0x{opcode:02X} at {self.where(self.eip - 1)}")
+        self.running = False
 
     def handle_nop(self):
         pass
 
-    def handle_mov(self):
-        dest = self.read_operand_type()
-        src = self.read_operand_type()
+    def handle_mov(self, dest, src):
         self.set_value(dest, self.get_value(src))
 
-    def handle_add(self):
-        dest = self.read_operand_type()
-        src = self.read_operand_type()
-        self.set_value(dest, self.get_value(dest) + self.get_value(src))
-
-    def handle_sub(self):
-        dest = self.read_operand_type()
-        src = self.read_operand_type()
-        self.set_value(dest, self.get_value(dest) - self.get_value(src))
-
-    def handle_inc(self):
-        reg_code = self.memory[self.eip]
-        self.eip += 1
-        reg_name = self.get_reg_name(reg_code)
-        self.registers[reg_name] += 1
-
-    def handle_dec(self):
-        reg_code = self.memory[self.eip]
-        self.eip += 1
-        reg_name = self.get_reg_name(reg_code)
-        self.registers[reg_name] -= 1
-
-    def handle_and(self):
-        dest = self.read_operand_type()
-        src = self.read_operand_type()
-        self.set_value(dest, self.get_value(dest) & self.get_value(src))
-
-    def handle_or(self):
-        dest = self.read_operand_type()
-        src = self.read_operand_type()
-        self.set_value(dest, self.get_value(dest) | self.get_value(src))
-
-    def handle_xor(self):
-        dest = self.read_operand_type()
-        src = self.read_operand_type()
-        self.set_value(dest, self.get_value(dest) ^ self.get_value(src))
-
-    def handle_cmp(self):
-        op1 = self.read_operand_type()
-        op2 = self.read_operand_type()
-        val1 = self.get_value(op1)
-        val2 = self.get_value(op2)
-        result = val1 - val2
-        self.eflags = 0
-        if result == 0:
-            self.eflags |= 0x40
-        if result < 0:
-            self.eflags |= 0x80
-
-    def handle_jmp(self):
-        address = struct.unpack('<I', bytes(self.memory[self.eip:self.eip + 4]))[0]
+    def handle_add(self, dest, src):
+        a = self.get_value(dest)
+        b = self.get_value(src)
+        result = (a + b) & MASK
+        self.eflags = flags_add(a, b, result)
+        self.set_value(dest, result)
+
+    def handle_sub(self, dest, src):
+        a = self.get_value(dest)
+        b = self.get_value(src)
+        result = (a - b) & MASK
+        self.eflags = flags_sub(a, b, result)
+        self.set_value(dest, result)
+
+    def handle_inc(self, reg_code):
+        result = (self.regs[reg_code] + 1) & MASK
+        self.eflags = flags_inc(self.eflags, result)
+        self.regs[reg_code] = result
+
+    def handle_dec(self, reg_code):
+        result = (self.regs[reg_code] - 1) & MASK
+        self.eflags = flags_dec(self.eflags, result)
+        self.regs[reg_code] = result
+
+    def handle_and(self, dest, src):
+        result = self.get_value(dest) & self.get_value(src)
+        self.eflags = flags_logic(result)
+        self.set_value(dest, result)
+
+    def handle_or(self, dest, src):
+        result = self.get_value(dest) | self.get_value(src)
+        self.eflags = flags_logic(result)
+        self.set_value(dest, result)
+
+    def handle_xor(self, dest, src):
+        result = self.get_value(dest) ^ self.get_value(src)
+        self.eflags = flags_logic(result)
+        self.set_value(dest, result)
+
+    def handle_cmp(self, op1, op2):
+        a = self.get_value(op1)
+        b = self.get_value(op2)
+        self.eflags = flags_sub(a, b, (a - b) & MASK)
+
+    def handle_jmp(self, address):
         self.eip = address
 
-    def handle_je(self):
-        address = struct.unpack('<I', bytes(self.memory[self.eip:self.eip + 4]))[0]
-        self.eip += 4
-        if self.eflags & 0x40:
+    def handle_je(self, address):
+        if self.eflags & ZF:
             self.eip = address
 
-    def handle_jne(self):
-        address = struct.unpack('<I', bytes(self.memory[self.eip:self.eip + 4]))[0]
-        self.eip += 4
-        if not (self.eflags & 0x40):
+    def handle_jne(self, address):
+        if not (self.eflags & ZF):
             self.eip = address
 
-    def handle_call(self):
-        address = struct.unpack('<I', bytes(self.memory[self.eip:self.eip + 4]))[0]
-        self.eip += 4
-        self.registers['STACKPOINTER'] -= 4
+    def handle_call(self, address):
+        regs = self.regs
+        regs[self.STACKPOINTER] = (regs[self.STACKPOINTER] - 4) & MASK
         return_addr = self.eip
-        addr = self.registers['STACKPOINTER']
-        self.memory[addr:addr + 4] = struct.pack('<I', return_addr)
+        addr = regs[self.STACKPOINTER]
+        self.memory.store32(addr, return_addr)
+        self.touch_code(addr, 4)
         self.eip = address
 
     def handle_ret(self):
-        addr = self.registers['STACKPOINTER']
-        return_addr = struct.unpack('<I', bytes(self.memory[addr:addr + 4]))[0]
-        self.registers['STACKPOINTER'] += 4
+        addr = self.regs[self.STACKPOINTER]
+        return_addr = self.memory.load32(addr)
+        self.regs[self.STACKPOINTER] = (addr + 4) & MASK
         self.eip = return_addr
 
-    def handle_push(self):
-        reg_code = self.memory[self.eip]
-        self.eip += 1
-        reg_name = self.get_reg_name(reg_code)
-        value = self.registers[reg_name]
-        self.registers['STACKPOINTER'] -= 4
-        addr = self.registers['STACKPOINTER']
-        self.memory[addr:addr + 4] = struct.pack('<I', value)
-
-    def handle_pop(self):
-        reg_code = self.memory[self.eip]
-        self.eip += 1
-        reg_name = self.get_reg_name(reg_code)
-        addr = self.registers['STACKPOINTER']
-        value = struct.unpack('<I', bytes(self.memory[addr:addr + 4]))[0]
-        self.registers['STACKPOINTER'] += 4
-        self.registers[reg_name] = value
-
-    def handle_int(self):
-        vector = self.memory[self.eip]
-        self.eip += 1
+    def handle_push(self, reg_code):
+        regs = self.regs
+        value = regs[reg_code]
+        regs[self.STACKPOINTER] = (regs[self.STACKPOINTER] - 4) & MASK
+        addr = regs[self.STACKPOINTER]
+        self.memory.store32(addr, value)
+        self.touch_code(addr, 4)
+
+    def handle_pop(self, reg_code):
+        regs = self.regs
+        addr = regs[self.STACKPOINTER]
+        value = self.memory.load32(addr)
+        regs[self.STACKPOINTER] = (addr + 4) & MASK
+        regs[reg_code] = value
+
+    def handle_int(self, vector):
         if vector in self.interrupts:
-            self.interrupts[vector]()
+            self.interrupts[vector](self)
         else:
-            print(f"Unhandled interrupt: 0x{vector:02X}")
+            self.console.writeline(f"Unhandled interrupt: 0x{vector:02X}")
 
     def handle_hlt(self):
         self.running = False
 
-    def handle_input(self):
-        reg_code = self.memory[self.eip]
-        self.eip += 1
-        reg_name = self.get_reg_name(reg_code)
-
+    def handle_input(self, reg_code):
         try:
-            user_input = input()
+            user_input = self.console.readline()
             value = int(user_input)
-            self.registers[reg_name] = value
+            self.regs[reg_code] = value & MASK
         except ValueError:
-            print(f"Type error: Invalid input, expected integer")
-            self.registers[reg_name] = 0
+            self.console.writeline(f"Type error: Invalid input, expected integer")
+            self.regs[reg_code] = 0
 
-    def handle_print(self):
-        op = self.read_operand_type()
+    def handle_print(self, op):
         value = self.get_value(op)
 
         if op[0] == 'IMM':
-            if value == 0:
-                print("", end='', flush=True)
-            else:
-                s = bytearray()
-                addr = value
-                while True:
-                    if addr >= len(self.memory):
-                        break
-                    ch = self.memory[addr]
-                    addr += 1
-                    if ch == 0:
-                        break
-                    s.append(ch)
+            if value:
+                end = self.memory.find(0, value)
+                if end < 0:
+                    end = len(self.memory)
                 try:
-                    decoded = bytes(s).decode('utf-8', errors='ignore').replace('\\n', '\n')
-                    print(decoded, end='', flush=True)
+                    decoded = str(self.memory.read(value, end - value), 'utf-8', 'ignore').replace('\\n', '\n')
+                    self.console.write(decoded)
                 except:
-                    print(f"Decode error: cannot decode string at 0x{value:08X}")
+                    self.console.writeline(f"Decode error: cannot decode string at 0x{value:08X}")
         else:
-            print(str(value) + " ", end='', flush=True)
+            self.console.write(str(value) + " ")
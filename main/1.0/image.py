@@ -0,0 +1,108 @@
+# PyXE Compiled Image
+
+import hashlib
+import mmap
+import os
+import struct
+import symbols
+
+MAGIC = b'PYXE'
+VERSION = 5
+CACHE_DIR = '__pyxecache__'
+EXTENSION = '.pyxc'
+
+HEADER = struct.Struct('<4sHB32sIIIII')
+LABEL = struct.Struct('<HqB')
+LINE = struct.Struct('<III')
+COMPILER = ('com.py', 'peephole.py', 'cfg.py', 'symbols.py')
+
+compiler_digest = None
+
+def compiler_hash():
+    global compiler_digest
+    if compiler_digest is None:
+        folder = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for name in COMPILER:
+            with open(os.path.join(folder, name), 'rb') as f:
+                digest.update(f.read())
+        compiler_digest = digest.hexdigest()
+    return compiler_digest
+
+def source_hash(source, options=''):
+    return hashlib.sha256((compiler_hash() + '\0' + options + '\0' + source).encode('utf-8')).digest()
+
+def cache_path(filename):
+    folder, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(folder, CACHE_DIR, os.path.splitext(name)[0] + EXTENSION)
+
+def dumps(result, digest):
+    table = result['symbols']
+    labels = bytearray()
+    for name, (value, kind) in table.symbols.items():
+        encoded = name.encode('utf-8')
+        labels += LABEL.pack(len(encoded), value, symbols.KINDS.index(kind))
+        labels += encoded
+
+    lines = bytearray()
+    for address, (line, column) in table.source.items():
+        lines += LINE.pack(address, line, column)
+
+    header = HEADER.pack(MAGIC, VERSION, result.get('version', 1), digest, len(result['code']), len(result['data']),
+                         result.get('bss', 0), len(table.symbols), len(table.source))
+    return header + result['code'] + result['data'] + bytes(labels) + bytes(lines)
+
+def loads(blob, digest=None, copy=True):
+    if len(blob) < HEADER.size:
+        return None
+    magic, version, code_version, stored, code_size, data_size, bss, label_count, line_count = HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if digest is not None and stored != digest:
+        return None
+
+    offset = HEADER.size
+    code = blob[offset:offset + code_size]
+    offset += code_size
+    data = blob[offset:offset + data_size]
+    if copy:
+        code, data = bytes(code), bytes(data)
+    offset += data_size
+
+    table = symbols.main()
+    for _ in range(label_count):
+        size, value, kind = LABEL.unpack_from(blob, offset)
+        offset += LABEL.size
+        table.define(bytes(blob[offset:offset + size]).decode('utf-8'), value, symbols.KINDS[kind])
+        offset += size
+
+    for _ in range(line_count):
+        address, line, column = LINE.unpack_from(blob, offset)
+        offset += LINE.size
+        table.locate(address, line, column)
+
+    return {'code': code, 'data': data, 'bss': bss, 'labels': table.labels(), 'symbols': table, 'version': code_version}
+
+def save(filename, result, digest):
+    folder = os.path.dirname(filename)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    temp = filename + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(dumps(result, digest))
+    os.replace(temp, filename)
+
+def load(filename, digest=None):
+    try:
+        with open(filename, 'rb') as f:
+            return loads(f.read(), digest)
+    except (OSError, IndexError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+def map(filename, digest=None):
+    try:
+        with open(filename, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return loads(memoryview(mapped), digest, copy=False)
+    except (OSError, IndexError, ValueError, struct.error, UnicodeDecodeError):
+        return None
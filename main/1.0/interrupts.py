@@ -0,0 +1,101 @@
+# PyXE Interrupts
+
+import terminal
+
+SYS_EXIT = 1
+SYS_READ = 3
+SYS_WRITE = 4
+SYS_MEMCPY = 20
+SYS_MEMSET = 21
+SYS_MEMCMP = 22
+SYS_STRLEN = 23
+SYS_STRCPY = 24
+
+def int_80(emulator):
+    syscall_num = emulator.registers['ACCUMULATOR']
+
+    if syscall_num == SYS_EXIT:
+        emulator.exit_code = emulator.registers['BASE']
+        emulator.console.writeline(f"\nProgram exited with code: {emulator.exit_code}")
+        emulator.running = False
+
+    elif syscall_num == SYS_WRITE:
+        fd = emulator.registers['BASE']
+        buffer_addr = emulator.registers['COUNT']
+        size = emulator.registers['DATA']
+
+        if fd == 1:
+            data = emulator.read_memory(buffer_addr, size)
+            emulator.console.write(data.decode('latin-1'))
+
+    elif syscall_num == SYS_READ:
+        fd = emulator.registers['BASE']
+        buffer_addr = emulator.registers['COUNT']
+        size = emulator.registers['DATA']
+
+        if fd == 0:
+            try:
+                user_input = emulator.console.readline()
+                byte_data = user_input.encode('utf-8')
+
+                if len(byte_data) > size:
+                    byte_data = byte_data[:size]
+
+                emulator.write_memory(buffer_addr, byte_data)
+                emulator.set_register('ACCUMULATOR', len(byte_data))
+
+            except terminal.Blocked:
+                raise
+            except:
+                emulator.set_register('ACCUMULATOR', -1)
+
+    elif syscall_num == SYS_MEMCPY:
+        dest = emulator.registers['BASE']
+        emulator.write_memory(dest, emulator.read_memory(emulator.registers['COUNT'], emulator.registers['DATA']))
+        emulator.set_register('ACCUMULATOR', dest)
+
+    elif syscall_num == SYS_MEMSET:
+        dest = emulator.registers['BASE']
+        emulator.write_memory(dest, bytes((emulator.registers['COUNT'] & 0xFF,)) * emulator.registers['DATA'])
+        emulator.set_register('ACCUMULATOR', dest)
+
+    elif syscall_num == SYS_MEMCMP:
+        size = emulator.registers['DATA']
+        first = emulator.read_memory(emulator.registers['BASE'], size)
+        second = emulator.read_memory(emulator.registers['COUNT'], size)
+        result = 0
+        if first != second:
+            index = first_difference(first, second)
+            result = first[index] - second[index]
+        emulator.set_register('ACCUMULATOR', result)
+
+    elif syscall_num == SYS_STRLEN:
+        emulator.set_register('ACCUMULATOR', string_length(emulator, emulator.registers['BASE']))
+
+    elif syscall_num == SYS_STRCPY:
+        dest = emulator.registers['BASE']
+        source = emulator.registers['COUNT']
+        size = min(string_length(emulator, source) + 1, len(emulator.memory) - source)
+        emulator.write_memory(dest, emulator.read_memory(source, size))
+        emulator.set_register('ACCUMULATOR', dest)
+
+def first_difference(first, second):
+    low, high = 0, len(first)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if first[low:middle] == second[low:middle]:
+            low = middle
+        else:
+            high = middle
+    return low
+
+def string_length(emulator, address):
+    if address >= len(emulator.memory):
+        return 0
+    end = emulator.memory.find(0, address)
+    return (end if end >= 0 else len(emulator.memory)) - address
+
+HANDLERS = (int_80,)
+
+def install(emulator):
+    emulator.register_interrupt(0x80, int_80)
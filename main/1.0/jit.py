@@ -0,0 +1,229 @@
+# PyXE Block Compiler
+
+import struct
+import alu
+import paging
+from alu import MASK, ZF
+
+WORD = struct.Struct('<I')
+
+class main:
+    TERMINATORS = {
+        'handle_jmp', 'handle_je', 'handle_jne', 'handle_call', 'handle_ret',
+        'handle_hlt', 'handle_int', 'handle_input', 'handle_end', 'handle_invalid'
+    }
+
+    def __init__(self, emulator):
+        self.emulator = emulator
+
+    def compile_block(self, address):
+        emulator = self.emulator
+        start = address
+        count = 1
+        self.constants = {}
+        lines = []
+
+        while True:
+            entry = emulator.decoded.get(address)
+            if entry is None:
+                entry = emulator.decoded[address] = emulator.decode(address)
+            handler, args, next_address = entry
+            name = handler.__name__
+
+            emitter = getattr(self, 'emit_' + name[7:], None)
+            if emitter is None or name in self.TERMINATORS:
+                lines.append(f"self.eip = {next_address}")
+                lines.extend(emitter(address, next_address, *args) if emitter else
+                             [f"self.{name}({', '.join(self.constant(arg) for arg in args)})"])
+                break
+
+            code, exits = emitter(address, next_address, *args)
+            lines.extend(code)
+            if exits:
+                lines.append(f"self.eip = {next_address}")
+                break
+            address = next_address
+            count += 1
+
+        memory = emulator.memory
+        source = "def block(self=self, regs=self.regs, memory=memory, load32=self.memory.load32, store32=self.memory.store32):\n"
+        source += ''.join(f"    {line}\n" for line in lines)
+        namespace = {
+            'self': emulator,
+            'memory': memory.buf if isinstance(memory, paging.flat) else memory,
+            'pack_into': WORD.pack_into,
+            'touch': memory.touch if isinstance(memory, paging.flat) else None,
+            'unpack_from': WORD.unpack_from,
+            'flags_add': alu.flags_add,
+            'flags_sub': alu.flags_sub,
+            'flags_logic': alu.flags_logic,
+            'flags_inc': alu.flags_inc,
+            'flags_dec': alu.flags_dec
+        }
+        namespace.update(self.constants)
+        exec(compile(source, f"<block 0x{start:08X}>", 'exec'), namespace)
+        block = namespace['block']
+        block.count = count
+        block.last = address
+        return block
+
+    def constant(self, value):
+        if isinstance(value, int):
+            return str(value)
+        name = f"K{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def in_code(self, address, size):
+        emulator = self.emulator
+        return address < emulator.code_end + emulator.MAX_INSTRUCTION and address + size > emulator.CODE_START
+
+    def register(self, reg_code):
+        return f"regs[{reg_code}]"
+
+    def load32(self, address):
+        if isinstance(self.emulator.memory, paging.flat):
+            return f"unpack_from(memory, {address})[0]"
+        return f"load32({address})"
+
+    def store32(self, address, value):
+        memory = self.emulator.memory
+        if isinstance(memory, paging.flat):
+            if isinstance(address, int):
+                memory.touch(address, 4)
+                return f"pack_into(memory, {address}, {value})"
+            return f"pack_into(memory, {address}, {value}); touch({address}, 4)"
+        return f"store32({address}, {value})"
+
+    def load(self, operand):
+        if operand[0] == 'REG':
+            return self.register(operand[1])
+        elif operand[0] == 'IMM':
+            return str(operand[1])
+        elif operand[0] == 'MEM':
+            return self.load32(operand[1])
+        elif operand[0] in ('IND', 'IDX'):
+            return self.load32(self.address(operand))
+        return "0"
+
+    def address(self, operand):
+        if operand[0] == 'IND':
+            return f"({self.register(operand[1])} + {operand[2]}) & {MASK}"
+        return f"({self.register(operand[1])} + {self.register(operand[2])} * {operand[3]}) & {MASK}"
+
+    def store(self, operand, value, next_address):
+        if operand[0] == 'REG':
+            return [f"{self.register(operand[1])} = {value}"], False
+        elif operand[0] == 'MEM':
+            address = operand[1]
+            code = [self.store32(address, value)]
+            if self.in_code(address, 4):
+                code.append(f"self.touch_code({address}, 4)")
+                return code, True
+            return code, False
+        elif operand[0] in ('IND', 'IDX'):
+            return [
+                f"addr = {self.address(operand)}",
+                self.store32("addr", value),
+                f"if {self.emulator.CODE_START - 4} < addr < {self.emulator.code_end + self.emulator.MAX_INSTRUCTION}:",
+                "    self.touch_code(addr, 4)",
+                f"    self.eip = {next_address}",
+                "    return"
+            ], False
+        return [], False
+
+    def emit_nop(self, address, next_address):
+        return [], False
+
+    def emit_mov(self, address, next_address, dest, src):
+        return self.store(dest, self.load(src), next_address)
+
+    def emit_add(self, address, next_address, dest, src):
+        return self.arithmetic(dest, src, '+', 'flags_add', next_address)
+
+    def emit_sub(self, address, next_address, dest, src):
+        return self.arithmetic(dest, src, '-', 'flags_sub', next_address)
+
+    def emit_and(self, address, next_address, dest, src):
+        return self.logic(dest, src, '&', next_address)
+
+    def emit_or(self, address, next_address, dest, src):
+        return self.logic(dest, src, '|', next_address)
+
+    def emit_xor(self, address, next_address, dest, src):
+        return self.logic(dest, src, '^', next_address)
+
+    def emit_inc(self, address, next_address, reg_code):
+        return [
+            f"result = ({self.register(reg_code)} + 1) & {MASK}",
+            "self.eflags = flags_inc(self.eflags, result)",
+            f"{self.register(reg_code)} = result"
+        ], False
+
+    def emit_dec(self, address, next_address, reg_code):
+        return [
+            f"result = ({self.register(reg_code)} - 1) & {MASK}",
+            "self.eflags = flags_dec(self.eflags, result)",
+            f"{self.register(reg_code)} = result"
+        ], False
+
+    def emit_cmp(self, address, next_address, op1, op2):
+        return [
+            f"a = {self.load(op1)}",
+            f"b = {self.load(op2)}",
+            f"self.eflags = flags_sub(a, b, (a - b) & {MASK})"
+        ], False
+
+    def arithmetic(self, dest, src, operator, flags, next_address):
+        code, exits = self.store(dest, "result", next_address)
+        return [
+            f"a = {self.load(dest)}",
+            f"b = {self.load(src)}",
+            f"result = (a {operator} b) & {MASK}",
+            f"self.eflags = {flags}(a, b, result)"
+        ] + code, exits
+
+    def logic(self, dest, src, operator, next_address):
+        code, exits = self.store(dest, "result", next_address)
+        return [
+            f"result = {self.load(dest)} {operator} {self.load(src)}",
+            "self.eflags = flags_logic(result)"
+        ] + code, exits
+
+    def emit_push(self, address, next_address, reg_code):
+        code = [
+            f"value = {self.register(reg_code)}",
+            f"addr = regs[{self.emulator.STACKPOINTER}] = (regs[{self.emulator.STACKPOINTER}] - 4) & {MASK}",
+            self.store32("addr", "value"),
+            f"if {self.emulator.CODE_START - 4} < addr < {self.emulator.code_end + self.emulator.MAX_INSTRUCTION}:",
+            "    self.touch_code(addr, 4)",
+            f"    self.eip = {next_address}",
+            "    return"
+        ]
+        return code, False
+
+    def emit_pop(self, address, next_address, reg_code):
+        return [
+            f"addr = regs[{self.emulator.STACKPOINTER}]",
+            f"value = {self.load32('addr')}",
+            f"regs[{self.emulator.STACKPOINTER}] = (addr + 4) & {MASK}",
+            f"{self.register(reg_code)} = value"
+        ], False
+
+    def emit_print(self, address, next_address, op):
+        return [f"self.handle_print({self.constant(op)})"], False
+
+    def emit_jmp(self, address, next_address, target):
+        return [f"self.eip = {target}"]
+
+    def emit_je(self, address, next_address, target):
+        return [f"if self.eflags & {ZF}: self.eip = {target}"]
+
+    def emit_jne(self, address, next_address, target):
+        return [f"if not (self.eflags & {ZF}): self.eip = {target}"]
+
+    def emit_call(self, address, next_address, target):
+        return [f"self.handle_call({target})"]
+
+    def emit_ret(self, address, next_address):
+        return ["self.handle_ret()"]
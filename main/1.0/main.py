@@ -1,63 +1,89 @@
 # PyXE Main
 
+import os
 import time
 import sys
+import cfg
 import com
 import emu
-
-def int_handler():
-    global emulator
-
-    syscall_num = emulator.registers['ACCUMULATOR']
-
-    if syscall_num == 1:
-        print(f"\nProgram exited with code: {emulator.registers['BASE']}")
-        emulator.running = False
-
-    elif syscall_num == 4:
-        fd = emulator.registers['BASE']
-        buffer_addr = emulator.registers['COUNT']
-        size = emulator.registers['DATA']
-
-        if fd == 1:
-            data = emulator.read_memory(buffer_addr, size)
-            try:
-                text = ''.join(chr(byte) for byte in data)
-                print(text, end='', flush=True)
-            except Exception as e:
-                print(f"Decoding error: {e}")
-
-    elif syscall_num == 3:
-        fd = emulator.registers['BASE']
-        buffer_addr = emulator.registers['COUNT']
-        size = emulator.registers['DATA']
-
-        if fd == 0:
-            try:
-                user_input = input()
-                byte_data = user_input.encode('utf-8')
-
-                if len(byte_data) > size:
-                    byte_data = byte_data[:size]
-
-                emulator.write_memory(buffer_addr, byte_data)
-                emulator.registers['ACCUMULATOR'] = len(byte_data)
-
-            except:
-                emulator.registers['ACCUMULATOR'] = -1
-
-compiler = com.main()
-emulator = emu.main()
-
-emulator.register_interrupt(0x80, int_handler)
+import interrupts
+import image
+import paging
+import profiler
+import snapshot
+import terminal
+import trace
+
+optimize = max([int(arg[2:]) for arg in sys.argv if arg[:2] == '-O' and arg[2:].isdigit()] or [0])
+version = 2 if '--compact' in sys.argv else 1
+options = dict(arg[2:].split('=', 1) for arg in sys.argv if arg.startswith('--') and '=' in arg)
+compiler = com.main(optimize, version)
+emulator = emu.main(use_jit='-j' in sys.argv,
+                    memory=paging.paged(1 << 32) if '--paged' in sys.argv else None,
+                    console=terminal.main(timeout=float(options['input-timeout']) if 'input-timeout' in options else None))
+
+interrupts.install(emulator)
+
+def stamp(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return path
+    return f"{path}:{info.st_mtime_ns}:{info.st_size}"
+
+def build(filename, source):
+    includes = ''.join(stamp(path) for path in compiler.includes(source, filename))
+    digest = image.source_hash(source, f"O{optimize}v{version}{includes}")
+    cached = image.cache_path(filename)
+
+    result = None
+    if '--compile-only' not in sys.argv:
+        result = image.load(cached, digest)
+    if result is None:
+        result = compiler.compile(source, filename)
+        if 'optimized' in result:
+            print(f"Optimizer: removed {result['optimized']['instructions']} instructions, "
+                  f"saved {result['optimized']['bytes']} bytes")
+        try:
+            image.save(cached, result, digest)
+        except OSError as e:
+            print(f"Cache warning: cannot write {cached}: {e}")
+    return result, cached
 
 try:
-    filename = sys.argv[1]
+    filenames = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+    filename = filenames[0]
+
+    if '--compile-only' in sys.argv:
+        for filename in filenames:
+            with open(filename, 'r', encoding='utf-8') as f:
+                result, cached = build(filename, f.read())
+            print(f"{filename} -> {cached}")
+        sys.exit(0)
+
+    if '--dump-cfg' in sys.argv:
+        with open(filename, 'r', encoding='utf-8') as f:
+            compiler.compile(f.read(), filename)
+        print(cfg.graph(compiler.program).dot())
+        sys.exit(0)
+
+    if filename.endswith(snapshot.EXTENSION):
+        try:
+            snapshot.load(filename, emulator)
+        except ValueError as e:
+            print(f"{filename}: {e}")
+            sys.exit(1)
+        result = {'code': b'', 'data': b'', 'labels': {}}
+    elif filename.endswith(image.EXTENSION):
+        result = image.map(filename) if '--paged' in sys.argv else image.load(filename)
+        if result is None:
+            print(f"{filename}: invalid or incompatible image")
+            sys.exit(1)
+    else:
+        with open(filename, 'r', encoding='utf-8') as f:
+            source = f.read()
+        result, cached = build(filename, source)
 
-    with open(filename, 'r', encoding='utf-8') as f:
-        source = f.read()
-
-    result = compiler.compile(source)
     data = emulator.read_memory(0x2000, len(result['data']))
     for i in range(0, len(data), 16):
         chunk = data[i:i + 16]
@@ -67,8 +93,39 @@ try:
         print()
     print()
 
-    emulator.load_program(result['code'], result['data'], result['labels'])
-    emulator.run()
+    if not filename.endswith(snapshot.EXTENSION):
+        emulator.load_program(result['code'], result['data'], result['labels'], result.get('version', 1),
+                              result.get('symbols'))
+
+    steps = int(options['steps']) if 'steps' in options else None
+    profile = [arg for arg in sys.argv if arg.startswith('--profile')]
+    if profile:
+        tracker = profiler.main(emulator, result.get('symbols'))
+        tracker.run(steps)
+        print()
+        print(tracker.report())
+        if '=' in profile[0]:
+            with open(profile[0].split('=', 1)[1], 'w', encoding='utf-8') as f:
+                f.write(tracker.collapsed())
+    elif 'trace' in options or 'trace-last' in options:
+        tracer = trace.main(emulator, options.get('trace'), int(options.get('trace-last', 0)))
+        try:
+            tracer.run(steps)
+        finally:
+            tracer.close()
+            if tracer.last:
+                print()
+                print(tracer.dump(result.get('symbols')))
+    else:
+        deadline = time.perf_counter() + float(options['time']) if 'time' in options else None
+        emulator.run(steps, deadline)
+
+    if emulator.status == 'steps':
+        print(f"\nStopped: instruction limit of {steps} reached at 0x{emulator.eip:08X}")
+    elif emulator.status == 'timeout':
+        print(f"\nStopped: time limit of {options['time']} seconds reached at 0x{emulator.eip:08X}")
+    elif emulator.status == 'blocked':
+        print(f"\nStopped: no input within {options['input-timeout']} seconds at 0x{emulator.eip:08X}")
 
     if '-d' in sys.argv:
         for reg, value in emulator.registers.items():
@@ -77,6 +134,9 @@ try:
 except IndexError:
     pass
 
+except SystemExit:
+    raise
+
 except:
     print('Fatal error has happened.\n')
     
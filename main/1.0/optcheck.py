@@ -0,0 +1,113 @@
+# PyXE Optimizer Check
+
+import sys
+import session
+
+PROGRAMS = {
+    'constants': """
+    drag COUNT, 3
+    compare COUNT, 3
+    go-true equal
+    print "wrong\\n"
+equal:
+    drag ACCUMULATOR, 5
+    drag ACCUMULATOR, 7
+    print ACCUMULATOR
+    stop
+    print "unreachable\\n"
+""",
+    'loop': """
+    drag COUNT, 0
+    drag ACCUMULATOR, 0
+again:
+    increase COUNT
+    increase COUNT
+    increase COUNT
+    add ACCUMULATOR, COUNT
+    compare COUNT, 30
+    go-false again
+    print ACCUMULATOR
+    stop
+""",
+    'subroutine': """
+    drag BASE, 4
+    call double
+    call double
+    print BASE
+    stop
+double:
+    add BASE, BASE
+    return
+unused:
+    print "never called\\n"
+    return
+""",
+    'jump-table': """
+    drag BASE, table
+    drag COUNT, 0
+next:
+    drag ACCUMULATOR, [BASE+COUNT*4]
+    place ACCUMULATOR
+    return
+done:
+    increase COUNT
+    compare COUNT, 3
+    go-false next
+    stop
+first:
+    print "first\\n"
+    go done
+second:
+    print "second\\n"
+    go done
+third:
+    print "third\\n"
+    go done
+defdouble table: first, second, third
+""",
+    'computed-call': """
+    drag DATA, handlers
+    drag COUNT, 0
+call_next:
+    drag ACCUMULATOR, returned
+    place ACCUMULATOR
+    drag ACCUMULATOR, [DATA+COUNT*4]
+    place ACCUMULATOR
+    return
+returned:
+    increase COUNT
+    compare COUNT, 2
+    go-false call_next
+    print BASE
+    stop
+add_ten:
+    add BASE, 10
+    return
+add_one:
+    add BASE, 1
+    return
+defdouble handlers: add_ten, add_one
+"""
+}
+
+def run(source, level, version):
+    report = session.main(optimize=level, version=version).compile_and_run(source, steps=100000)
+    return report['status'], report['exit_code'], report['output']
+
+def check(levels=(1, 2, 3), versions=(1, 2)):
+    failures = []
+    for name, source in PROGRAMS.items():
+        for version in versions:
+            expected = run(source, 0, version)
+            for level in levels:
+                got = run(source, level, version)
+                if got != expected:
+                    failures.append((name, level, version, expected, got))
+    return failures
+
+if __name__ == '__main__':
+    failures = check()
+    for name, level, version, expected, got in failures:
+        print(f"{name} -O{level} v{version}: expected {expected!r}, got {got!r}")
+    print(f"{len(PROGRAMS)} programs, {len(failures)} failures")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,212 @@
+# PyXE Memory
+
+import struct
+
+PAGE_BITS = 12
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+ZERO_PAGE = bytes(PAGE_SIZE)
+
+WORD = struct.Struct('<I')
+unpack_word = WORD.unpack_from
+pack_word = WORD.pack_into
+
+class flat:
+    def __init__(self, size=1024 * 1024):
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.dirty = set()
+
+    def __len__(self):
+        return len(self.buf)
+
+    def __getitem__(self, index):
+        return self.buf[index]
+
+    def __setitem__(self, index, value):
+        self.buf[index] = value
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self.buf))
+            self.touch(start, stop - start)
+        else:
+            self.dirty.add(index >> PAGE_BITS)
+
+    def touch(self, address, size):
+        if size > 0:
+            self.dirty.update(range(address >> PAGE_BITS, ((address + size - 1) >> PAGE_BITS) + 1))
+
+    def load32(self, address):
+        return unpack_word(self.buf, address)[0]
+
+    def store32(self, address, value):
+        pack_word(self.buf, address, value)
+        self.dirty.add(address >> PAGE_BITS)
+        self.dirty.add((address + 3) >> PAGE_BITS)
+
+    def read(self, address, size):
+        return self.view[address:address + size]
+
+    def write(self, address, data):
+        self.buf[address:address + len(data)] = data
+        self.touch(address, len(data))
+
+    def load(self, address, data):
+        self.buf[address:address + len(data)] = data
+        self.touch(address, len(data))
+
+    def find(self, sub, start):
+        return self.buf.find(sub, start)
+
+    def used_pages(self):
+        for number in sorted(self.dirty):
+            start = number << PAGE_BITS
+            page = self.view[start:start + PAGE_SIZE]
+            if len(page) and page != ZERO_PAGE[:len(page)]:
+                yield number, page
+
+    def reset(self):
+        for number in self.dirty:
+            start = number << PAGE_BITS
+            page = self.view[start:start + PAGE_SIZE]
+            page[:] = ZERO_PAGE[:len(page)]
+        self.dirty.clear()
+
+    def clone(self):
+        copy = flat(0)
+        copy.buf = bytearray(self.buf)
+        copy.view = memoryview(copy.buf)
+        copy.dirty = set(self.dirty)
+        return copy
+
+class paged:
+    def __init__(self, size=1024 * 1024):
+        self.size = size
+        self.pages = {}
+        self.writable = {}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            return self.read(start, max(stop - start, 0))
+        if not 0 <= index < self.size:
+            raise IndexError('memory index out of range')
+        page = self.pages.get(index >> PAGE_BITS)
+        return page[index & PAGE_MASK] if page is not None else 0
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            if stop - start != len(value):
+                raise ValueError('paged memory cannot be resized')
+            self.write(start, value)
+        else:
+            self.write(index, bytes((value,)))
+
+    def check(self, address, size):
+        if address < 0 or address + size > self.size:
+            raise IndexError(f"memory access out of range at 0x{address:08X}")
+
+    def page(self, number):
+        page = self.writable.get(number)
+        if page is None:
+            shared = self.pages.get(number)
+            page = bytearray(shared) if shared is not None else bytearray(PAGE_SIZE)
+            self.pages[number] = self.writable[number] = page
+        return page
+
+    def load32(self, address):
+        offset = address & PAGE_MASK
+        if offset <= PAGE_SIZE - 4 and address + 4 <= self.size:
+            page = self.pages.get(address >> PAGE_BITS)
+            return unpack_word(page, offset)[0] if page is not None else 0
+        return unpack_word(self.read(address, 4))[0]
+
+    def store32(self, address, value):
+        offset = address & PAGE_MASK
+        if offset <= PAGE_SIZE - 4 and address + 4 <= self.size:
+            page = self.writable.get(address >> PAGE_BITS)
+            if page is None:
+                page = self.page(address >> PAGE_BITS)
+            pack_word(page, offset, value)
+        else:
+            self.write(address, WORD.pack(value))
+
+    def read(self, address, size):
+        self.check(address, size)
+        offset = address & PAGE_MASK
+        if offset + size <= PAGE_SIZE:
+            page = self.pages.get(address >> PAGE_BITS, ZERO_PAGE)
+            return bytes(page[offset:offset + size])
+
+        chunks = []
+        while size > 0:
+            offset = address & PAGE_MASK
+            count = min(size, PAGE_SIZE - offset)
+            page = self.pages.get(address >> PAGE_BITS, ZERO_PAGE)
+            chunks.append(page[offset:offset + count])
+            address += count
+            size -= count
+        return b''.join(chunks)
+
+    def write(self, address, data):
+        self.check(address, len(data))
+        data = memoryview(data).cast('B')
+        position = 0
+        while position < len(data):
+            offset = address & PAGE_MASK
+            count = min(len(data) - position, PAGE_SIZE - offset)
+            self.page(address >> PAGE_BITS)[offset:offset + count] = data[position:position + count]
+            address += count
+            position += count
+
+    def load(self, address, data):
+        self.check(address, len(data))
+        data = memoryview(data).cast('B')
+        position = 0
+        while position < len(data):
+            offset = address & PAGE_MASK
+            count = min(len(data) - position, PAGE_SIZE - offset)
+            number = address >> PAGE_BITS
+            if count == PAGE_SIZE:
+                self.pages[number] = data[position:position + count]
+            else:
+                shared = self.pages.get(number)
+                page = bytearray(shared) if shared is not None else bytearray(PAGE_SIZE)
+                page[offset:offset + count] = data[position:position + count]
+                self.pages[number] = bytes(page)
+            self.writable.pop(number, None)
+            address += count
+            position += count
+
+    def find(self, sub, start):
+        number = start >> PAGE_BITS
+        offset = start & PAGE_MASK
+        last = (self.size - 1) >> PAGE_BITS
+        while number <= last and start < self.size:
+            page = self.pages.get(number, ZERO_PAGE)
+            index = page.find(sub, offset) if not isinstance(page, memoryview) else bytes(page).find(sub, offset)
+            if index >= 0:
+                found = (number << PAGE_BITS) + index
+                return found if found < self.size else -1
+            number += 1
+            offset = 0
+        return -1
+
+    def used_pages(self):
+        for number in sorted(self.pages):
+            page = self.pages[number]
+            if page != ZERO_PAGE:
+                yield number, page
+
+    def reset(self):
+        self.pages.clear()
+        self.writable.clear()
+
+    def clone(self):
+        copy = paged(self.size)
+        copy.pages = dict(self.pages)
+        self.writable.clear()
+        return copy
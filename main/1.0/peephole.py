@@ -0,0 +1,138 @@
+# PyXE Peephole Optimizer
+
+import cfg
+
+FLAG_WRITERS = {'ADD', 'SUB', 'AND', 'OR', 'XOR', 'CMP'}
+FLAG_NEUTRAL = {'MOV', 'PUSH', 'POP', 'PRINT', 'INPUT', 'NOP'}
+JUMPS = {'JMP', 'JE', 'JNE'}
+BRANCHES = {'JMP', 'JE', 'JNE', 'CALL'}
+
+REGISTERS = {'ACCUMULATOR', 'BASE', 'COUNT', 'DATA', 'SOURCE', 'DEST', 'BASEPOINTER', 'STACKPOINTER'}
+
+def instruction_size(mnemonic, operands):
+    if mnemonic in ('MOV', 'ADD', 'SUB', 'CMP', 'AND', 'OR', 'XOR'):
+        return 1 + 5 * min(len(operands), 2)
+    if mnemonic == 'PRINT':
+        return 6
+    if mnemonic in BRANCHES:
+        return 5 if operands else 1
+    if mnemonic in ('INC', 'DEC', 'PUSH', 'POP', 'INPUT', 'INT'):
+        return 2 if operands else 1
+    return 1
+
+def measure(program, size=instruction_size):
+    count = total = 0
+    for line_no, kind, first, second in program:
+        if kind == 'ins':
+            count += 1
+            total += size(first, second)
+    return count, total
+
+def is_register(operand):
+    return operand.upper() in REGISTERS
+
+def same_operand(a, b):
+    return a == b or (is_register(a) and a.upper() == b.upper())
+
+def is_zero(operand):
+    try:
+        return int(operand, 0) == 0
+    except ValueError:
+        return False
+
+class main:
+    def __init__(self, level=1, size=instruction_size):
+        self.level = level
+        self.size = size
+        self.flow = cfg.main()
+        self.removed = 0
+        self.saved = 0
+
+    def optimize(self, program):
+        if any(kind == 'ins' and first in BRANCHES and second and second[0][:1].isdigit()
+               for line_no, kind, first, second in program):
+            return program
+
+        count, size = measure(program, self.size)
+        while True:
+            result = self.redundant(self.stack_pairs(program))
+            if self.level >= 2:
+                result = self.fold(result)
+            if self.level >= 3:
+                result = self.flow.optimize(result)
+            if result == program:
+                break
+            program = result
+
+        new_count, new_size = measure(program, self.size)
+        self.removed += count - new_count
+        self.saved += size - new_size
+        return program
+
+    def flags_dead(self, program, index):
+        for position in range(index, len(program)):
+            line_no, kind, first, second = program[position]
+            if kind != 'ins':
+                return False
+            if first in FLAG_WRITERS:
+                return True
+            if first not in FLAG_NEUTRAL:
+                return False
+        return False
+
+    def falls_to(self, program, index, label):
+        labels = set()
+        for position in range(index, len(program)):
+            line_no, kind, first, second = program[position]
+            if kind != 'label':
+                return kind == 'ins' and label in labels
+            labels.add(first)
+        return label in labels
+
+    def redundant(self, program):
+        result = []
+        for index, record in enumerate(program):
+            line_no, kind, mnemonic, operands = record
+            if kind == 'ins' and len(operands) >= 1:
+                if mnemonic == 'MOV' and len(operands) == 2 and same_operand(*operands):
+                    continue
+                if mnemonic in ('ADD', 'SUB') and len(operands) == 2 and is_register(operands[0]) and \
+                        is_zero(operands[1]) and self.flags_dead(program, index + 1):
+                    continue
+                if mnemonic in JUMPS and self.falls_to(program, index + 1, operands[0]):
+                    continue
+            result.append(record)
+        return result
+
+    def stack_pairs(self, program):
+        result = []
+        for record in program:
+            line_no, kind, mnemonic, operands = record
+            if kind == 'ins' and mnemonic == 'POP' and operands and result:
+                last = result[-1]
+                if last[1] == 'ins' and last[2] == 'PUSH' and last[3] and same_operand(last[3][0], operands[0]):
+                    result.pop()
+                    continue
+            result.append(record)
+        return result
+
+    def fold(self, program):
+        result = []
+        index = 0
+        while index < len(program):
+            line_no, kind, mnemonic, operands = program[index]
+            end = index + 1
+            if kind == 'ins' and mnemonic in ('INC', 'DEC') and operands and is_register(operands[0]):
+                while end < len(program) and program[end][1] == 'ins' and program[end][2] == mnemonic and \
+                        program[end][3] and program[end][3][0].upper() == operands[0].upper():
+                    end += 1
+            count = end - index
+            if count > 1 and self.flags_dead(program, end):
+                folded = (line_no, 'ins', 'ADD' if mnemonic == 'INC' else 'SUB', (operands[0], str(count)))
+                if self.size(folded[2], folded[3]) < count * self.size(mnemonic, operands):
+                    result.append(folded)
+                    index = end
+                    continue
+            result.extend(program[index:end])
+            index = end
+        return result
@@ -0,0 +1,119 @@
+# PyXE Profiler
+
+import time
+import com
+import symbols
+import terminal
+
+OPCODE_NAMES = {opcode: name for name, opcode in com.main.INSTRUCTION_OPCODES_V2.items()}
+
+class main:
+    def __init__(self, emulator, table=None):
+        self.emulator = emulator
+        self.symbols = table or symbols.main()
+        self.counts = {}
+        self.stacks = {}
+        self.edges = {}
+        self.interrupt_calls = {}
+        self.interrupt_time = {}
+
+    def run(self, steps=None):
+        emulator = self.emulator
+        decoded = emulator.decoded
+        counts = self.counts
+        stacks = self.stacks
+        edges = self.edges
+        call = emulator.instruction_handlers[0xA0]
+        ret = emulator.instruction_handlers[0xB0]
+
+        saved = dict(emulator.interrupts)
+        for vector, handler in saved.items():
+            emulator.interrupts[vector] = self.timed(vector, handler)
+
+        stack = (emulator.eip,)
+        executed = 0
+        eip = emulator.eip
+        emulator.running = True
+        emulator.status = 'running'
+        try:
+            while emulator.running and (steps is None or executed < steps):
+                eip = emulator.eip
+                entry = decoded.get(eip)
+                if entry is None:
+                    entry = decoded[eip] = emulator.decode(eip)
+                handler, args, emulator.eip = entry
+
+                handler(*args)
+                executed += 1
+
+                counts[eip] = counts.get(eip, 0) + 1
+                stacks[stack] = stacks.get(stack, 0) + 1
+                if handler is call:
+                    edge = (stack[-1], args[0])
+                    edges[edge] = edges.get(edge, 0) + 1
+                    stack += (args[0],)
+                elif handler is ret and len(stack) > 1:
+                    stack = stack[:-1]
+            emulator.status = 'steps' if emulator.running else 'halted'
+        except terminal.Blocked:
+            emulator.eip = eip
+            emulator.status = 'blocked'
+        finally:
+            emulator.interrupts.update(saved)
+            emulator.console.flush()
+
+        return executed
+
+    def timed(self, vector, handler):
+        def wrapper(emulator):
+            started = time.perf_counter()
+            try:
+                return handler(emulator)
+            finally:
+                self.interrupt_calls[vector] = self.interrupt_calls.get(vector, 0) + 1
+                self.interrupt_time[vector] = self.interrupt_time.get(vector, 0.0) + time.perf_counter() - started
+        return wrapper
+
+    def symbol(self, address):
+        return self.symbols.symbol(address)
+
+    def function(self, address):
+        return self.symbols.exact(address)
+
+    def report(self, top=20):
+        total = sum(self.counts.values()) or 1
+        out = [f"Instructions executed: {sum(self.counts.values())}", '', 'Hot spots:']
+        out.append(f"{'count':>10} {'%':>6}  {'address':<10} {'line':>8}  {'opcode':<6} location")
+        for address, count in sorted(self.counts.items(), key=lambda item: -item[1])[:top]:
+            location = self.symbols.source.get(address)
+            line = f"{location[0]}:{location[1]}" if location else ''
+            opcode = OPCODE_NAMES.get(self.emulator.memory[address], '?')
+            out.append(f"{count:>10} {100 * count / total:>6.2f}  0x{address:08X} {line:>8}  {opcode:<6} {self.symbol(address)}")
+
+        opcodes = {}
+        for address, count in self.counts.items():
+            name = OPCODE_NAMES.get(self.emulator.memory[address], '?')
+            opcodes[name] = opcodes.get(name, 0) + count
+        out += ['', 'By opcode:']
+        for name, count in sorted(opcodes.items(), key=lambda item: -item[1]):
+            out.append(f"{count:>10} {100 * count / total:>6.2f}  {name}")
+
+        if self.edges:
+            out += ['', 'Calls:']
+            for (caller, callee), count in sorted(self.edges.items(), key=lambda item: -item[1]):
+                out.append(f"{count:>10}  {self.function(caller)} -> {self.function(callee)}")
+
+        if self.interrupt_calls:
+            out += ['', 'Interrupts:']
+            for vector, count in sorted(self.interrupt_calls.items()):
+                spent = self.interrupt_time[vector]
+                out.append(f"{count:>10}  0x{vector:02X}  {spent * 1000:.3f} ms")
+
+        return '\n'.join(out)
+
+    def collapsed(self):
+        folded = {}
+        for stack, count in self.stacks.items():
+            key = ';'.join(self.function(address) for address in stack)
+            folded[key] = folded.get(key, 0) + count
+        return ''.join(f"{key} {count}\n" for key, count in folded.items())
@@ -0,0 +1,70 @@
+# PyXE Session
+
+import contextlib
+import io
+import sys
+import com
+import emu
+import interrupts
+import paging
+import terminal
+
+class main:
+    def __init__(self, optimize=0, version=1, mem_size=1024 * 1024, use_jit=False, memory=None):
+        self.compiler = com.main(optimize, version)
+        self.output = io.StringIO()
+        self.console = terminal.main(stdout=self.output, line_buffered=False)
+        self.emulator = emu.main(use_jit=use_jit, console=self.console,
+                                 memory=memory if memory is not None else paging.paged(mem_size))
+        interrupts.install(self.emulator)
+
+    def reset(self, stdin=''):
+        self.emulator.reset()
+        self.console.reset(io.StringIO(stdin))
+        self.output.seek(0)
+        self.output.truncate()
+
+    def compile(self, source, filename=None):
+        with contextlib.redirect_stdout(self.output):
+            return self.compiler.compile(source, filename)
+
+    def run(self, result, stdin='', steps=None, deadline=None):
+        self.reset(stdin)
+        emulator = self.emulator
+        report = {
+            'status': 'halted',
+            'exit_code': None,
+            'output': '',
+            'registers': {},
+            'eip': 0,
+            'instructions': 0
+        }
+
+        try:
+            with contextlib.redirect_stdout(self.output):
+                emulator.load_program(result['code'], result['data'], result['labels'], result.get('version', 1),
+                                      result.get('symbols'))
+                report['instructions'] = emulator.run(sys.maxsize if steps is None else steps, deadline)
+            report['status'] = emulator.status
+            report['exit_code'] = emulator.exit_code
+            report['registers'] = dict(emulator.registers)
+            report['eip'] = emulator.eip
+
+        except Exception as e:
+            self.console.flush()
+            report['status'] = 'error'
+            report['error'] = f"{type(e).__name__}: {e}"
+
+        report['output'] = self.output.getvalue()
+        return report
+
+    def compile_and_run(self, source, stdin='', steps=None, deadline=None, filename=None):
+        self.reset(stdin)
+        try:
+            result = self.compile(source, filename)
+        except Exception as e:
+            return {'status': 'error', 'error': f"{type(e).__name__}: {e}", 'output': self.output.getvalue()}
+        compiled = self.output.getvalue()
+        report = self.run(result, stdin, steps, deadline)
+        report['output'] = compiled + report['output']
+        return report
@@ -0,0 +1,129 @@
+# PyXE Snapshots
+
+import os
+import struct
+import sys
+import zlib
+import interrupts
+import paging
+
+MAGIC = b'PYXS'
+VERSION = 2
+EXTENSION = '.pyxs'
+
+FLAT = 0
+PAGED = 1
+
+HEADER = struct.Struct('<4sHBBQIIIqII')
+REGISTERS = struct.Struct('<8I')
+PAGE = struct.Struct('<II')
+VECTOR = struct.Struct('<BH')
+
+def handler_name(handler):
+    return f"{handler.__module__}:{handler.__qualname__}"
+
+HANDLERS = {handler_name(handler): handler for handler in interrupts.HANDLERS}
+
+def resolve_handler(name):
+    if name not in HANDLERS:
+        raise ValueError(f"unknown interrupt handler '{name}'")
+    return HANDLERS[name]
+
+def dumps(emulator, level=6):
+    emulator.console.flush()
+    memory = emulator.memory
+    size = len(memory)
+
+    pages = bytearray()
+    page_count = 0
+    for number, page in memory.used_pages():
+        page = page[:size - (number << paging.PAGE_BITS)]
+        packed = zlib.compress(page, level)
+        pages += PAGE.pack(number, len(packed))
+        pages += packed
+        page_count += 1
+
+    vectors = bytearray()
+    for vector, handler in sorted(emulator.interrupts.items()):
+        encoded = handler_name(handler).encode('utf-8')
+        vectors += VECTOR.pack(vector, len(encoded))
+        vectors += encoded
+
+    kind = PAGED if isinstance(memory, paging.paged) else FLAT
+    exit_code = -1 if emulator.exit_code is None else emulator.exit_code
+    header = HEADER.pack(MAGIC, VERSION, kind, emulator.version, size, emulator.eip, emulator.eflags, emulator.code_end,
+                         exit_code, page_count, len(emulator.interrupts))
+    return header + REGISTERS.pack(*emulator.regs[1:]) + bytes(pages) + bytes(vectors)
+
+def loads(blob, emulator):
+    magic, version, kind, code_version, size, eip, eflags, code_end, exit_code, page_count, vector_count = HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a PyXE snapshot')
+
+    offset = HEADER.size
+    regs = REGISTERS.unpack_from(blob, offset)
+    offset += REGISTERS.size
+
+    memory = paging.paged(size) if kind == PAGED else paging.flat(size)
+    for _ in range(page_count):
+        number, length = PAGE.unpack_from(blob, offset)
+        offset += PAGE.size
+        memory.load(number << paging.PAGE_BITS, zlib.decompress(blob[offset:offset + length]))
+        offset += length
+
+    interrupts = {}
+    for _ in range(vector_count):
+        vector, length = VECTOR.unpack_from(blob, offset)
+        offset += VECTOR.size
+        interrupts[vector] = resolve_handler(bytes(blob[offset:offset + length]).decode('utf-8'))
+        offset += length
+
+    emulator.memory = memory
+    emulator.regs[1:] = regs
+    emulator.eip = eip
+    emulator.eflags = eflags
+    emulator.code_end = code_end
+    emulator.version = code_version
+    emulator.instruction_decoders = emulator.formats[code_version]
+    emulator.exit_code = None if exit_code < 0 else exit_code
+    emulator.interrupts = interrupts
+    emulator.running = False
+    emulator.decoded.clear()
+    emulator.blocks.clear()
+    return emulator
+
+def save(filename, emulator):
+    temp = filename + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(dumps(emulator))
+    os.replace(temp, filename)
+
+def load(filename, emulator):
+    with open(filename, 'rb') as f:
+        return loads(f.read(), emulator)
+
+if __name__ == '__main__':
+    import io
+    import com
+    import emu
+    import terminal
+
+    if len(sys.argv) < 4:
+        print("Usage: python snapshot.py program.pyxe steps output.pyxs [input]")
+        sys.exit(1)
+
+    source_name, steps, output = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    stdin = None
+    if len(sys.argv) > 4:
+        with open(sys.argv[4], 'r', encoding='utf-8') as f:
+            stdin = io.StringIO(f.read())
+
+    with open(source_name, 'r', encoding='utf-8') as f:
+        result = com.main().compile(f.read(), source_name)
+
+    emulator = emu.main(console=terminal.main(stdin=stdin), memory=paging.paged())
+    interrupts.install(emulator)
+    emulator.load_program(result['code'], result['data'], result['labels'])
+    executed = emulator.run(steps)
+    save(output, emulator)
+    print(f"\n{output}: {executed} instructions, eip=0x{emulator.eip:08X}")
@@ -0,0 +1,77 @@
+# PyXE Symbols
+
+import bisect
+
+KINDS = ('code', 'data', 'const')
+
+class main:
+    def __init__(self):
+        self.symbols = {}
+        self.source = {}
+        self.indexed = False
+
+    def __contains__(self, name):
+        return name in self.symbols
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def define(self, name, value, kind):
+        self.symbols[name] = (value, kind)
+        self.indexed = False
+
+    def locate(self, address, line, column):
+        self.source[address] = (line, column)
+        self.indexed = False
+
+    def labels(self):
+        return {name: value for name, (value, kind) in self.symbols.items()}
+
+    def index(self):
+        self.sorted = {}
+        for kind in ('code', 'data'):
+            pairs = sorted((value, name) for name, (value, symbol_kind) in self.symbols.items() if symbol_kind == kind)
+            self.sorted[kind] = ([value for value, name in pairs], [name for value, name in pairs])
+        self.lines = sorted(self.source)
+        self.indexed = True
+
+    def nearest(self, address, kind='code'):
+        if not self.indexed:
+            self.index()
+        addresses, names = self.sorted[kind]
+        position = bisect.bisect_right(addresses, address) - 1
+        if position < 0:
+            return None
+        return names[position], address - addresses[position]
+
+    def symbol(self, address, kind='code'):
+        found = self.nearest(address, kind)
+        if found is None:
+            return f"0x{address:08X}"
+        name, offset = found
+        return name + (f"+{offset}" if offset else '')
+
+    def exact(self, address, kind='code'):
+        found = self.nearest(address, kind)
+        if found is None or found[1]:
+            return f"0x{address:08X}"
+        return found[0]
+
+    def location(self, address):
+        if not self.indexed:
+            self.index()
+        position = bisect.bisect_right(self.lines, address) - 1
+        if position < 0:
+            return None
+        line, column = self.source[self.lines[position]]
+        found = self.nearest(address)
+        return line, column, found[0] if found else None
+
+    def describe(self, address):
+        parts = []
+        if self.nearest(address) is not None:
+            parts.append(self.symbol(address))
+        if address in self.source:
+            line, column = self.source[address]
+            parts.append(f"line {line}:{column}")
+        return ', '.join(parts)
@@ -0,0 +1,74 @@
+# PyXE Terminal Device
+
+import queue
+import sys
+import threading
+
+class Blocked(Exception):
+    pass
+
+class Timeout(Blocked):
+    pass
+
+class WouldBlock(Blocked):
+    pass
+
+class main:
+    def __init__(self, stdin=None, stdout=None, threshold=4096, line_buffered=True, timeout=None):
+        self.stdin = stdin
+        self.stdout = stdout
+        self.threshold = threshold
+        self.line_buffered = line_buffered
+        self.timeout = timeout
+        self.buffer = []
+        self.size = 0
+        self.lines = None
+
+    def reset(self, stdin=None):
+        self.stdin = stdin
+        self.buffer.clear()
+        self.size = 0
+        self.lines = None
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= self.threshold or (self.line_buffered and '\n' in text):
+            self.flush()
+
+    def writeline(self, text):
+        self.write(text + '\n')
+
+    def flush(self):
+        if self.buffer:
+            stream = self.stdout or sys.stdout
+            stream.write(''.join(self.buffer))
+            stream.flush()
+            self.buffer.clear()
+            self.size = 0
+
+    def readline(self):
+        self.flush()
+        if self.timeout is None:
+            line = (self.stdin or sys.stdin).readline()
+        else:
+            if self.lines is None:
+                self.lines = queue.Queue()
+                threading.Thread(target=self.reader, daemon=True).start()
+            try:
+                line = self.lines.get(timeout=self.timeout)
+            except queue.Empty:
+                raise Timeout(f"no input within {self.timeout} seconds")
+        if not line:
+            if self.lines is not None:
+                self.lines.put(line)
+            raise EOFError
+        return line[:-1] if line.endswith('\n') else line
+
+    def reader(self):
+        stream = self.stdin or sys.stdin
+        while True:
+            line = stream.readline()
+            self.lines.put(line)
+            if not line:
+                break
@@ -0,0 +1,187 @@
+# PyXE Execution Trace
+
+import array
+import struct
+import sys
+import com
+
+MAGIC = b'PYXT'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+
+FIELDS = ('eip', 'opcode', 'first', 'second', 'eflags', 'changed')
+REGISTERS = 8
+RECORD = len(FIELDS) + REGISTERS
+CHUNK = 4096
+
+OPCODE_NAMES = {opcode: name for name, opcode in com.main.INSTRUCTION_OPCODES_V2.items()}
+REGISTER_OPCODES = {com.main.INSTRUCTION_OPCODES[name] for name in ('INC', 'DEC', 'PUSH', 'POP', 'INPUT')}
+REGISTER_NAMES = ('ACCUMULATOR', 'BASE', 'COUNT', 'DATA', 'SOURCE', 'DEST', 'BASEPOINTER', 'STACKPOINTER')
+
+class main:
+    def __init__(self, emulator, path=None, last=None, chunk=CHUNK):
+        self.emulator = emulator
+        self.path = path
+        self.last = last
+        self.chunk = chunk
+        self.count = 0
+        self.file = None
+        self.log = array.array('I')
+        if last:
+            self.ring = array.array('I', bytes(4 * RECORD * last))
+        if path:
+            self.file = open(path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD))
+
+    def run(self, steps=None):
+        emulator = self.emulator
+        decoded = emulator.decoded
+        regs = emulator.regs
+        memory = emulator.memory
+        get_value = emulator.get_value
+        log = self.log
+        ring = self.ring if self.last else None
+        size = self.last or 0
+        limit = self.chunk * RECORD
+        executed = 0
+
+        emulator.running = True
+        try:
+            while emulator.running and (steps is None or executed < steps):
+                eip = emulator.eip
+                entry = decoded.get(eip)
+                if entry is None:
+                    entry = decoded[eip] = emulator.decode(eip)
+                handler, args, emulator.eip = entry
+
+                opcode = memory[eip] if eip < emulator.code_end else 0
+                values = [0, 0]
+                if opcode in REGISTER_OPCODES:
+                    values[0] = regs[args[0]]
+                else:
+                    for index, arg in enumerate(args[:2]):
+                        values[index] = get_value(arg) if type(arg) is tuple else arg
+                before = regs[1:]
+
+                handler(*args)
+                executed += 1
+
+                after = regs[1:]
+                changed = 0
+                if after != before:
+                    for index in range(REGISTERS):
+                        if after[index] != before[index]:
+                            changed |= 1 << index
+                record = (eip, opcode, values[0], values[1], emulator.eflags, changed, *after)
+
+                if ring is not None:
+                    position = (self.count % size) * RECORD
+                    ring[position:position + RECORD] = array.array('I', record)
+                if self.file:
+                    log.extend(record)
+                    if len(log) >= limit:
+                        self.flush()
+                self.count += 1
+        finally:
+            self.flush()
+            emulator.console.flush()
+
+        return executed
+
+    def flush(self):
+        if self.file and self.log:
+            self.log.tofile(self.file)
+            del self.log[:]
+            self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def records(self):
+        if not self.last:
+            return []
+        kept = min(self.count, self.last)
+        start = self.count - kept
+        result = []
+        for number in range(start, self.count):
+            position = (number % self.last) * RECORD
+            result.append((number, tuple(self.ring[position:position + RECORD])))
+        return result
+
+    def dump(self, symbols=None):
+        return '\n'.join(describe(number, record, symbols) for number, record in self.records())
+
+def read(path):
+    with open(path, 'rb') as f:
+        magic, version, width = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or width != RECORD:
+            raise ValueError(f"{path}: not a PyXE trace")
+        number = 0
+        while True:
+            chunk = array.array('I')
+            try:
+                chunk.fromfile(f, CHUNK * RECORD)
+            except EOFError:
+                pass
+            for position in range(0, len(chunk) - RECORD + 1, RECORD):
+                yield number, tuple(chunk[position:position + RECORD])
+                number += 1
+            if len(chunk) < CHUNK * RECORD:
+                break
+
+def describe(number, record, symbols=None):
+    eip, opcode, first, second, eflags, changed = record[:len(FIELDS)]
+    registers = record[len(FIELDS):]
+    location = symbols.symbol(eip) if symbols is not None else ''
+    name = OPCODE_NAMES.get(opcode, f"0x{opcode:02X}")
+    deltas = ' '.join(f"{REGISTER_NAMES[index]}=0x{registers[index]:08X}"
+                      for index in range(REGISTERS) if changed & (1 << index))
+    return (f"{number:>8}  0x{eip:08X} {location:<20} {name:<6} {first:>10} {second:>10}"
+            f"  flags=0x{eflags:03X}  {deltas}").rstrip()
+
+def replay(path, symbols=None):
+    for number, record in read(path):
+        yield describe(number, record, symbols)
+
+def diff(first_path, second_path):
+    first = read(first_path)
+    second = read(second_path)
+    while True:
+        a = next(first, None)
+        b = next(second, None)
+        if a is None and b is None:
+            return None
+        if a is None or b is None or a[1] != b[1]:
+            return a, b
+
+def load_symbols(filename):
+    if filename.endswith('.pyxc'):
+        import image
+        result = image.load(filename)
+        return result['symbols'] if result else None
+    with open(filename, 'r', encoding='utf-8') as f:
+        return com.main().compile(f.read(), filename)['symbols']
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] not in ('show', 'diff'):
+        print("Usage: python trace.py show TRACE [program.pyxe]")
+        print("       python trace.py diff TRACE TRACE [program.pyxe]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'show':
+        symbols = load_symbols(sys.argv[3]) if len(sys.argv) > 3 else None
+        for line in replay(sys.argv[2], symbols):
+            print(line)
+    else:
+        symbols = load_symbols(sys.argv[4]) if len(sys.argv) > 4 else None
+        found = diff(sys.argv[2], sys.argv[3])
+        if found is None:
+            print("Traces are identical")
+        else:
+            for path, entry in zip(sys.argv[2:4], found):
+                print(f"{path}:")
+                print(describe(*entry, symbols) if entry else "    (trace ended)")
+            sys.exit(1)
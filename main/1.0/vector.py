@@ -0,0 +1,429 @@
+# PyXE Vector Engine
+
+import io
+import json
+import sys
+import com
+import emu
+import interrupts
+import paging
+import terminal
+from alu import MASK, SIGN, CF, ZF, SF, OF
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+OFFSETS = (0, 1, 2, 3)
+PARKED = 1 << 62
+
+class Unsupported(Exception):
+    pass
+
+class window(paging.flat):
+    def __init__(self, row):
+        self.buf = memoryview(row)
+        self.view = self.buf
+        self.dirty = set()
+
+    def find(self, sub, start):
+        for offset in range(start, len(self.buf), paging.PAGE_SIZE):
+            found = bytes(self.view[offset:offset + paging.PAGE_SIZE]).find(sub)
+            if found >= 0:
+                return offset + found
+        return -1
+
+class lane(emu.main):
+    dirty = False
+
+    def touch_code(self, address, size):
+        if address < self.code_end + self.MAX_INSTRUCTION and address + size > self.CODE_START:
+            self.dirty = True
+        super().touch_code(address, size)
+
+def zero_sign(result):
+    return (result == 0) * ZF | (result >> 24) & SF
+
+def flags_add(a, b, result):
+    return zero_sign(result) | (a + b > MASK) * CF | (~(a ^ b) & (a ^ result) & SIGN) >> 20
+
+def flags_sub(a, b, result):
+    return zero_sign(result) | (a < b) * CF | ((a ^ b) & (a ^ result) & SIGN) >> 20
+
+def flags_inc(eflags, result):
+    return eflags & CF | zero_sign(result) | (result == SIGN) * OF
+
+def flags_dec(eflags, result):
+    return eflags & CF | zero_sign(result) | (result == 0x7FFFFFFF) * OF
+
+class main:
+    def __init__(self, inputs, mem_size=1024 * 1024):
+        if numpy is None:
+            raise RuntimeError("the vector engine needs NumPy (pip install numpy)")
+
+        count = len(inputs)
+        self.count = count
+        self.size = mem_size
+        self.memory = numpy.zeros((count, mem_size), dtype=numpy.uint8)
+        self.outputs = [io.StringIO() for _ in range(count)]
+        self.lanes = []
+        for index in range(count):
+            console = terminal.main(stdin=io.StringIO(inputs[index]), stdout=self.outputs[index], line_buffered=False)
+            cpu = lane(console=console, memory=window(self.memory[index]))
+            interrupts.install(cpu)
+            self.lanes.append(cpu)
+        self.program = emu.main(memory=paging.paged(mem_size))
+
+        self.regs = numpy.zeros((len(emu.main.REGISTERS) + 1, count), dtype=numpy.int64)
+        self.regs[emu.main.STACKPOINTER] = mem_size - 4
+        self.eip = numpy.full(count, emu.main.CODE_START, dtype=numpy.int64)
+        self.eflags = numpy.zeros(count, dtype=numpy.int64)
+        self.running = numpy.ones(count, dtype=bool)
+        self.detached = numpy.zeros(count, dtype=bool)
+        self.executed = numpy.zeros(count, dtype=numpy.int64)
+        self.status = ['ready'] * count
+        self.errors = {}
+        self.touched = []
+        self.decoded = {}
+
+        self.ops = {
+            'handle_nop': self.op_nop,
+            'handle_mov': self.op_mov,
+            'handle_add': self.op_add,
+            'handle_sub': self.op_sub,
+            'handle_and': self.op_and,
+            'handle_or': self.op_or,
+            'handle_xor': self.op_xor,
+            'handle_inc': self.op_inc,
+            'handle_dec': self.op_dec,
+            'handle_cmp': self.op_cmp,
+            'handle_jmp': self.op_jmp,
+            'handle_je': self.op_je,
+            'handle_jne': self.op_jne,
+            'handle_call': self.op_call,
+            'handle_ret': self.op_ret,
+            'handle_push': self.op_push,
+            'handle_pop': self.op_pop,
+            'handle_print': self.op_print,
+            'handle_hlt': self.op_hlt
+        }
+
+    def load_program(self, code, data, labels, version=1, symbols=None):
+        self.program.load_program(code, data, labels, version, symbols)
+        for cpu in self.lanes:
+            cpu.load_program(code, data, labels, version, symbols)
+        self.decoded.clear()
+        self.eip[:] = emu.main.CODE_START
+
+    def decode(self, eip):
+        entry = self.decoded.get(eip)
+        if entry is None:
+            handler, args, following = self.program.decode(eip)
+            entry = self.decoded[eip] = (self.ops.get(handler.__name__), args, following)
+        return entry
+
+    def run(self, steps=None):
+        self.status = ['running' if running else status for running, status in zip(self.running, self.status)]
+        waiting = self.running & ~self.detached
+        if steps is not None:
+            waiting &= self.executed < steps
+        rounds = 0
+        while True:
+            eips = numpy.where(waiting, self.eip, PARKED)
+            eip = int(eips.min())
+            if eip == PARKED:
+                break
+            lanes = numpy.flatnonzero(eips == eip)
+            self.step(eip, lanes)
+            self.executed[lanes] += 1
+            waiting[lanes] = self.running[lanes] & ~self.detached[lanes]
+            if steps is not None:
+                waiting[lanes] &= self.executed[lanes] < steps
+            rounds += 1
+
+        for index in numpy.flatnonzero(self.detached & self.running).tolist():
+            self.finish(index, None if steps is None else steps - int(self.executed[index]))
+
+        for index in range(self.count):
+            if self.status[index] == 'running':
+                self.status[index] = 'steps' if self.running[index] else 'halted'
+            self.lanes[index].console.flush()
+        return rounds
+
+    def step(self, eip, lanes):
+        op, args, following = self.decode(eip)
+        if op is not None:
+            self.eip[lanes] = following
+            try:
+                op(lanes, following, *args)
+            except Unsupported:
+                self.eip[lanes] = eip
+            else:
+                if self.touched:
+                    for touched in self.touched:
+                        for index in touched.tolist():
+                            self.detach(index)
+                    self.touched.clear()
+                return
+        self.fallback(lanes)
+
+    def fallback(self, lanes):
+        for index in lanes.tolist():
+            cpu = self.lanes[index]
+            self.store(index)
+            try:
+                cpu.run(1)
+            except Exception as e:
+                self.fail(index, e)
+                continue
+            self.fetch(index)
+            if cpu.status == 'blocked':
+                self.running[index] = False
+                self.status[index] = 'blocked'
+            elif not cpu.running:
+                self.running[index] = False
+            elif cpu.dirty:
+                self.detach(index)
+
+    def detach(self, index):
+        cpu = self.lanes[index]
+        self.store(index)
+        cpu.decoded.clear()
+        cpu.blocks.clear()
+        self.detached[index] = True
+
+    def finish(self, index, steps):
+        cpu = self.lanes[index]
+        try:
+            executed = cpu.run(sys.maxsize if steps is None else steps)
+        except Exception as e:
+            self.fail(index, e)
+            return
+        self.executed[index] += executed
+        self.fetch(index)
+        self.running[index] = cpu.running
+        self.status[index] = cpu.status
+
+    def fail(self, index, error):
+        self.running[index] = False
+        self.status[index] = 'error'
+        self.errors[index] = f"{type(error).__name__}: {error}"
+
+    def store(self, index):
+        cpu = self.lanes[index]
+        cpu.regs[1:] = self.regs[1:, index].tolist()
+        cpu.eip = int(self.eip[index])
+        cpu.eflags = int(self.eflags[index])
+
+    def fetch(self, index):
+        cpu = self.lanes[index]
+        self.regs[1:, index] = cpu.regs[1:]
+        self.eip[index] = cpu.eip
+        self.eflags[index] = cpu.eflags
+
+    def results(self):
+        reports = []
+        for index, cpu in enumerate(self.lanes):
+            if not self.detached[index]:
+                self.store(index)
+            report = {
+                'status': self.status[index],
+                'exit_code': cpu.exit_code,
+                'output': self.outputs[index].getvalue(),
+                'registers': dict(cpu.registers),
+                'eip': cpu.eip,
+                'instructions': int(self.executed[index])
+            }
+            if index in self.errors:
+                report['error'] = self.errors[index]
+            reports.append(report)
+        return reports
+
+    def code_range(self, address):
+        return (address < self.program.code_end + emu.main.MAX_INSTRUCTION) & (address + 4 > emu.main.CODE_START)
+
+    def load32(self, lanes, address):
+        if isinstance(address, int):
+            if address + 4 > self.size:
+                raise Unsupported
+            words = self.memory[lanes, address:address + 4]
+        else:
+            if (address + 4 > self.size).any():
+                raise Unsupported
+            words = self.memory[lanes[:, None], address[:, None] + OFFSETS]
+        return numpy.ascontiguousarray(words).view('<u4')[:, 0].astype(numpy.int64)
+
+    def store32(self, lanes, address, values):
+        words = numpy.broadcast_to(numpy.asarray(values, dtype='<u4'), lanes.shape)
+        words = numpy.ascontiguousarray(words).view(numpy.uint8).reshape(-1, 4)
+        if isinstance(address, int):
+            if address + 4 > self.size:
+                raise Unsupported
+            self.memory[lanes, address:address + 4] = words
+            if self.code_range(address):
+                self.touched.append(lanes)
+        else:
+            if (address + 4 > self.size).any():
+                raise Unsupported
+            self.memory[lanes[:, None], address[:, None] + OFFSETS] = words
+            touched = self.code_range(address)
+            if touched.any():
+                self.touched.append(lanes[touched])
+
+    def address(self, operand, lanes):
+        if operand[0] == 'IND':
+            return (self.regs[operand[1], lanes] + operand[2]) & MASK
+        return (self.regs[operand[1], lanes] + self.regs[operand[2], lanes] * operand[3]) & MASK
+
+    def get(self, operand, lanes):
+        kind = operand[0]
+        if kind == 'REG':
+            return self.regs[operand[1], lanes]
+        elif kind == 'IMM':
+            return operand[1]
+        elif kind == 'MEM':
+            return self.load32(lanes, operand[1])
+        elif kind in ('IND', 'IDX'):
+            return self.load32(lanes, self.address(operand, lanes))
+        return 0
+
+    def put(self, operand, lanes, values):
+        kind = operand[0]
+        if kind == 'REG':
+            self.regs[operand[1], lanes] = values
+        elif kind == 'MEM':
+            self.store32(lanes, operand[1], values)
+        elif kind in ('IND', 'IDX'):
+            self.store32(lanes, self.address(operand, lanes), values)
+
+    def op_nop(self, lanes, following):
+        pass
+
+    def op_mov(self, lanes, following, dest, src):
+        self.put(dest, lanes, self.get(src, lanes))
+
+    def op_add(self, lanes, following, dest, src):
+        a = self.get(dest, lanes)
+        b = self.get(src, lanes)
+        result = (a + b) & MASK
+        self.eflags[lanes] = flags_add(a, b, result)
+        self.put(dest, lanes, result)
+
+    def op_sub(self, lanes, following, dest, src):
+        a = self.get(dest, lanes)
+        b = self.get(src, lanes)
+        result = (a - b) & MASK
+        self.eflags[lanes] = flags_sub(a, b, result)
+        self.put(dest, lanes, result)
+
+    def op_and(self, lanes, following, dest, src):
+        result = self.get(dest, lanes) & self.get(src, lanes)
+        self.eflags[lanes] = zero_sign(result)
+        self.put(dest, lanes, result)
+
+    def op_or(self, lanes, following, dest, src):
+        result = self.get(dest, lanes) | self.get(src, lanes)
+        self.eflags[lanes] = zero_sign(result)
+        self.put(dest, lanes, result)
+
+    def op_xor(self, lanes, following, dest, src):
+        result = self.get(dest, lanes) ^ self.get(src, lanes)
+        self.eflags[lanes] = zero_sign(result)
+        self.put(dest, lanes, result)
+
+    def op_inc(self, lanes, following, reg_code):
+        result = (self.regs[reg_code, lanes] + 1) & MASK
+        self.eflags[lanes] = flags_inc(self.eflags[lanes], result)
+        self.regs[reg_code, lanes] = result
+
+    def op_dec(self, lanes, following, reg_code):
+        result = (self.regs[reg_code, lanes] - 1) & MASK
+        self.eflags[lanes] = flags_dec(self.eflags[lanes], result)
+        self.regs[reg_code, lanes] = result
+
+    def op_cmp(self, lanes, following, op1, op2):
+        a = self.get(op1, lanes)
+        b = self.get(op2, lanes)
+        self.eflags[lanes] = flags_sub(a, b, (a - b) & MASK)
+
+    def op_jmp(self, lanes, following, address):
+        self.eip[lanes] = address
+
+    def op_je(self, lanes, following, address):
+        self.eip[lanes[(self.eflags[lanes] & ZF) != 0]] = address
+
+    def op_jne(self, lanes, following, address):
+        self.eip[lanes[(self.eflags[lanes] & ZF) == 0]] = address
+
+    def op_call(self, lanes, following, address):
+        stack = (self.regs[emu.main.STACKPOINTER, lanes] - 4) & MASK
+        self.store32(lanes, stack, following)
+        self.regs[emu.main.STACKPOINTER, lanes] = stack
+        self.eip[lanes] = address
+
+    def op_ret(self, lanes, following):
+        stack = self.regs[emu.main.STACKPOINTER, lanes]
+        target = self.load32(lanes, stack)
+        self.regs[emu.main.STACKPOINTER, lanes] = (stack + 4) & MASK
+        self.eip[lanes] = target
+
+    def op_push(self, lanes, following, reg_code):
+        value = self.regs[reg_code, lanes]
+        stack = (self.regs[emu.main.STACKPOINTER, lanes] - 4) & MASK
+        self.store32(lanes, stack, value)
+        self.regs[emu.main.STACKPOINTER, lanes] = stack
+
+    def op_pop(self, lanes, following, reg_code):
+        stack = self.regs[emu.main.STACKPOINTER, lanes]
+        value = self.load32(lanes, stack)
+        self.regs[emu.main.STACKPOINTER, lanes] = (stack + 4) & MASK
+        self.regs[reg_code, lanes] = value
+
+    def op_print(self, lanes, following, op):
+        if op[0] == 'IMM':
+            raise Unsupported
+        values = numpy.broadcast_to(self.get(op, lanes), lanes.shape)
+        for index, value in zip(lanes.tolist(), values.tolist()):
+            self.lanes[index].console.write(f"{value} ")
+
+    def op_hlt(self, lanes, following):
+        self.running[lanes] = False
+
+if __name__ == '__main__':
+    import batch
+
+    if len(sys.argv) < 3:
+        print("Usage: python vector.py program.pyxe INPUTS... [--steps N] [--memory BYTES] [--output FILE]")
+        sys.exit(1)
+
+    paths = []
+    options = {}
+    args = iter(sys.argv[2:])
+    for arg in args:
+        if arg in ('--steps', '--memory', '--output'):
+            options[arg] = next(args)
+        else:
+            paths.append(arg)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        result = com.main().compile(f.read(), sys.argv[1])
+
+    files = batch.collect(paths, '.in')
+    inputs = []
+    for name in files:
+        with open(name, 'r', encoding='utf-8') as f:
+            inputs.append(f.read())
+
+    engine = main(inputs, int(options['--memory']) if '--memory' in options else 1024 * 1024)
+    engine.load_program(result['code'], result['data'], result['labels'], result.get('version', 1),
+                        result.get('symbols'))
+    engine.run(int(options['--steps']) if '--steps' in options else None)
+
+    out = open(options['--output'], 'w', encoding='utf-8') if '--output' in options else sys.stdout
+    try:
+        for name, report in zip(files, engine.results()):
+            out.write(json.dumps({'file': name, **report}) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()